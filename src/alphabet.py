@@ -1,10 +1,23 @@
-from typing import List
+from typing import List, Dict, Sequence, Union
+
+import numpy as np
 
 from src.symbol import Symbol
 
+UNKNOWN: int = -1  # code of labels outside the alphabet
+
+
 class Alphabet:
     def __init__(self, symbol_labels: List[str]):
-        self.symbols: List[Symbol] = [Symbol(symbol) for symbol in symbol_labels]
+        self.symbols: List[Symbol] = [Symbol.intern(label=symbol) for symbol in symbol_labels]
+        self.index: Dict[str, int] = {symbol.label: code for code, symbol in enumerate(self.symbols)}
+
+        # code point -> symbol code, used to encode whole strings at once when every symbol is a single character
+        self.lookup: np.ndarray = None
+        if self.symbols and all(len(symbol.label) == 1 for symbol in self.symbols):
+            self.lookup = np.full(max(ord(symbol.label) for symbol in self.symbols) + 1, UNKNOWN, dtype=np.int32)
+            for code, symbol in enumerate(self.symbols):
+                self.lookup[ord(symbol.label)] = code
 
     def __eq__(self, other):
         if not isinstance(other, Alphabet):
@@ -23,15 +36,34 @@ class Alphabet:
     def __repr__(self):
         return str(self.symbols)
 
+    def __contains__(self, item):
+        if isinstance(item, Symbol):
+            return item.label in self.index
+        return isinstance(item, str) and item in self.index
+
     def __iter__(self):
-        self.n = 0
-        return self
+        # a fresh iterator each time, so nested and concurrent loops don't share a cursor
+        return iter(self.symbols)
+
+    def encode(self, string: Union[str, Sequence[str]]) -> np.ndarray:
+        """Translate a string, or a sequence of symbol labels, into an array of symbol codes."""
+
+        if isinstance(string, str) and self.lookup is not None:
+            points: np.ndarray = np.frombuffer(string.encode("utf-32-le"), dtype=np.uint32)
+            inside: np.ndarray = points < len(self.lookup)
+
+            codes: np.ndarray = np.full(len(points), UNKNOWN, dtype=np.int32)
+            codes[inside] = self.lookup[points[inside]]
+            return codes
+
+        return np.fromiter((self.index.get(str(symbol), UNKNOWN) for symbol in string), dtype=np.int32, count=len(string))
+
+    def decode(self, codes: Sequence[int]) -> str:
+        """Translate an array of symbol codes back into a string."""
 
-    def __next__(self):
-        if self.n < len(self.symbols):
-            symbol: Symbol = self.symbols[self.n]
-            self.n += 1
-            return symbol
-        else:
-            raise StopIteration
+        codes: np.ndarray = np.asarray(codes, dtype=np.int64)
+        if codes.size and (codes.min() < 0 or codes.max() >= len(self.symbols)):
+            raise ValueError("Codes must be indexes of symbols in the alphabet.")
 
+        labels: List[str] = [symbol.label for symbol in self.symbols]
+        return "".join(map(labels.__getitem__, codes.tolist()))
@@ -1,23 +1,37 @@
-from typing import List, Dict, Union
-from random import randint
-
+from typing import List, Dict, Tuple, Set, FrozenSet, Union, Iterable, Iterator, Sequence, Callable
+from collections import Counter
+from contextlib import contextmanager
+from concurrent.futures import Executor
+from mmap import mmap
+import codecs
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
 import pandas as pd
 
 from src.symbol import Symbol
 from src.alphabet import Alphabet
-from src.state import State
+from src.state import State, MooreState
 from src.transaction import Transaction, MealyTransaction
+from src.table import TransitionTable, MealyTable, MooreTable, PrefixCache, DEAD
+from src.regex import ThompsonBuilder
+from src.tracer import Tracer, PrintTracer, OutputPrintTracer, MatchTracer
+
+
+SUBSET_LIMIT: int = 4096  # subsets built to recognize with a determinized table before simulating sets instead
 
 
 class Automata:
     """Entities composed of states and transitions, used to accept or to reject a sentence."""
 
-    def __init__(self, label: str, alphabet: Alphabet):
+    table_class: type = TransitionTable  # kind of compiled table built by compile and converted by from_table
+
+    def __init__(self, label: str, alphabet: Union[Alphabet, List[str]]):
         self.label: str = label
 
         # quintuple of elements that define an automata
         self.states: Dict[int, State] = {}
-        self.alphabet: Alphabet = alphabet
+        self.alphabet: Alphabet = alphabet if isinstance(alphabet, Alphabet) else Alphabet(symbol_labels=alphabet)
         self.transactions: Dict[int, Transaction] = {}
         self.initial_state: State = None
         self.final_states: Dict[int, State] = {}
@@ -27,7 +41,39 @@ class Automata:
 
         self.is_total: bool = False
 
-        self.tabular_notation: pd.DataFrame = self.update_tabular_notation()
+        # hash indexes that replace linear searches by label
+        self.state_ids: Dict[str, int] = {}  # state label -> sid
+        self.transaction_ids: Dict[str, int] = {}  # transaction label -> tid
+        self.outgoing: Dict[Tuple[int, str], List[int]] = {}  # (departure sid, symbol label) -> tids
+        self.state_transactions: Dict[int, Set[int]] = {}  # sid -> tids departing from or arriving at it
+
+        # creations deferred while inside bulk(), None otherwise
+        self.pending_states: List[Tuple[str, bool, bool]] = None
+        self.pending_transactions: List[Tuple[str, ...]] = None
+
+        # table, active states and bytes decoder of the stream consumed by feed()
+        self.stream_table: TransitionTable = None
+        self.stream_states: FrozenSet[int] = None
+        self.stream_decoder: codecs.IncrementalDecoder = None
+
+        self.compiled_table: TransitionTable = None  # built on demand by compile()
+        self.deterministic_table: TransitionTable = None  # built on demand by compile_deterministic()
+        self.acceptor_table: TransitionTable = None  # built on demand by compile_acceptor()
+        self.determinized: Automata = None  # built on demand by determinize()
+        self.subset_limit: int = SUBSET_LIMIT
+        self.minimized: Automata = None  # built on demand by minimize()
+        self.tabular_cache: pd.DataFrame = None  # built on demand by tabular_notation
+
+        self.prefix_capacity: int = 0  # prefixes remembered by recognize, 0 to disable
+        self.prefix_cache: PrefixCache = None  # built on demand by recognize when enabled
+
+    @property
+    def tabular_notation(self) -> pd.DataFrame:
+        """Dataframe built on first access after a mutation, instead of on every mutation."""
+
+        if self.tabular_cache is None:
+            self.tabular_cache = self.update_tabular_notation()
+        return self.tabular_cache
 
     def update_tabular_notation(self) -> pd.DataFrame:
         """Dataframe that describes general information for all states."""
@@ -39,47 +85,434 @@ class Automata:
             "state": [state.label for state in self.states.values()],
         }
 
-        for symbol in self.alphabet:
-            symbol_transactions: Dict[str, List[str]] = {state: [] for state in data["state"]}
-            for transaction in self.transactions.values():
-                if transaction.symbol == symbol:
-                    symbol_transactions[transaction.departure_state.label].append(transaction.arrival_state.label)
-            data[str(symbol)] = [arrival_states for arrival_states in symbol_transactions.values()]
+        # a single pass over transactions fills the cell of its departure state under its symbol column
+        row: Dict[str, int] = {label: i for i, label in enumerate(data["state"])}
+        columns: Dict[str, List[List[str]]] = {str(symbol): [[] for _ in row] for symbol in self.alphabet}
+        for transaction in self.transactions.values():
+            columns[str(transaction.symbol)][row[transaction.departure_state.label]].append(
+                transaction.arrival_state.label
+            )
+        data.update(columns)
 
         return pd.DataFrame(data=data)
 
+    def invalidate(self):
+        """Discard every structure derived from the quintuple, so it is rebuilt when needed again."""
+
+        self.compiled_table = None
+        self.deterministic_table = None
+        self.acceptor_table = None
+        self.determinized = None
+        self.minimized = None
+        self.tabular_cache = None
+        self.prefix_cache = None
+
+    def compile(self) -> TransitionTable:
+        """Build the integer-indexed transition table of the automata, reused until the next mutation."""
+
+        if self.compiled_table is None:
+            self.compiled_table = TransitionTable(**self.table_arguments())
+
+        return self.compiled_table
+
+    def table_arguments(self) -> Dict[str, object]:
+        """Number states and symbols in insertion order, and describe transactions with those numbers."""
+
+        state_index: Dict[str, int] = {state.label: i for i, state in enumerate(self.states.values())}
+        symbols: List[str] = [str(symbol) for symbol in self.alphabet]
+        symbol_index: Dict[str, int] = {symbol: i for i, symbol in enumerate(symbols)}
+
+        edges: List[Tuple[int, int, int]] = [
+            (
+                state_index[transaction.departure_state.label],
+                symbol_index[str(transaction.symbol)],
+                state_index[transaction.arrival_state.label]
+            )
+            for transaction in self.transactions.values()
+        ]
+
+        return {
+            "labels": [state.label for state in self.states.values()],
+            "symbols": symbols,
+            "initial": state_index[self.initial_state.label] if self.initial_state else DEAD,
+            "final": [state.is_final for state in self.states.values()],
+            "edges": edges,
+        }
+
+    @classmethod
+    def table_states(cls, table: TransitionTable) -> List[Tuple[Union[str, bool], ...]]:
+        """States of a compiled table, as the tuples taken by from_edges."""
+
+        # plain lists, since looping over the numpy scalars of loaded tables is much slower
+        final: List[bool] = table.final.tolist()
+        return [(state_label, state == table.initial, final[state]) for state, state_label in enumerate(table.labels)]
+
+    @classmethod
+    def table_transitions(cls, table: TransitionTable) -> List[Tuple[str, ...]]:
+        """Transitions of a compiled table, as the tuples taken by from_edges."""
+
+        return [
+            (table.labels[departure], table.labels[arrival], table.symbols[code])
+            for departure, code, arrival in table.edge_list
+        ]
+
+    @classmethod
+    def table_alphabets(cls, table: TransitionTable) -> Dict[str, Alphabet]:
+        """Alphabets of a compiled table, as the keyword arguments taken by from_edges."""
+
+        return {"alphabet": Alphabet(symbol_labels=table.symbols)}
+
+    @classmethod
+    def from_table(cls, table: TransitionTable, label: str) -> "Automata":
+        """Create an automata from a compiled transition table of its table_class."""
+
+        if not isinstance(table, cls.table_class):
+            raise ValueError(f"Only a {cls.table_class.__name__} can be converted into a {cls.__name__}.")
+
+        automata: Automata = cls.from_edges(
+            states=cls.table_states(table=table),
+            transitions=cls.table_transitions(table=table),
+            label=label,
+            **cls.table_alphabets(table=table)
+        )
+
+        # states and symbols were created in table order, so the table stays valid
+        automata.compiled_table = table
+
+        return automata
+
+    @classmethod
+    def from_regex(
+            cls, pattern: str, alphabet: Union[Alphabet, List[str]], label: str = "M",
+            determinize: bool = False, minimize: bool = False
+    ) -> "Automata":
+        """Create an automata that accepts the strings fully matched by a regex, by Thompson construction."""
+
+        symbols: List[str] = [str(symbol) for symbol in alphabet]
+        automata: Automata = cls.from_table(table=ThompsonBuilder(pattern=pattern, symbols=symbols).build(), label=label)
+
+        if minimize:
+            return automata.minimize()
+        if determinize:
+            return automata.determinize()
+        return automata
+
+    def save(self, path: str):
+        """Write the compiled table of the automata to a binary file, see TransitionTable.save."""
+
+        self.compile().save(path=path)
+
+    @classmethod
+    def load(cls, path: str, label: str = "M", mmap: bool = True) -> "Automata":
+        """Create an automata from a file written by save(), memory-mapping its tables when mmap is set."""
+
+        return cls.from_table(table=TransitionTable.load(path=path, mmap=mmap), label=label)
+
+    def to_jff(self, path: str):
+        """Export the automata to a JFLAP .jff file, laying its states on a row."""
+
+        root: ElementTree.Element = ElementTree.Element("structure")
+        ElementTree.SubElement(root, "type").text = (
+            "mealy" if isinstance(self, Transducer) else "moore" if isinstance(self, MooreMachine) else "fa"
+        )
+        automaton: ElementTree.Element = ElementTree.SubElement(root, "automaton")
+
+        ids: Dict[str, str] = {}
+        for i, state in enumerate(self.states.values()):
+            ids[state.label] = str(i)
+            element: ElementTree.Element = ElementTree.SubElement(automaton, "state", id=str(i), name=state.label)
+            ElementTree.SubElement(element, "x").text = str(100.0 * (i + 1))
+            ElementTree.SubElement(element, "y").text = "100.0"
+            if state.is_initial:
+                ElementTree.SubElement(element, "initial")
+            if state.is_final:
+                ElementTree.SubElement(element, "final")
+            if isinstance(state, MooreState):
+                ElementTree.SubElement(element, "output").text = str(state.output)
+
+        for transaction in self.transactions.values():
+            element = ElementTree.SubElement(automaton, "transition")
+            ElementTree.SubElement(element, "from").text = ids[transaction.departure_state.label]
+            ElementTree.SubElement(element, "to").text = ids[transaction.arrival_state.label]
+            ElementTree.SubElement(element, "read").text = str(transaction.symbol)
+            if isinstance(transaction, MealyTransaction):
+                ElementTree.SubElement(element, "transout").text = str(transaction.output)
+
+        ElementTree.ElementTree(root).write(path, encoding="UTF-8", xml_declaration=True)
+
+    @staticmethod
+    def read_jff(path: str, kind: str) -> Tuple[List[Tuple[Union[str, bool], ...]], List[Tuple[str, ...]]]:
+        """
+        Read the (label, is_initial, is_final) states, with their output for Moore machines, and the (departure,
+        arrival, symbol) transitions, with their output for Mealy machines, of a JFLAP .jff file of the given kind.
+        λ-transitions of finite automata are removed, keeping the same language.
+        """
+
+        root: ElementTree.Element = ElementTree.parse(path).getroot()
+        if root.findtext("type") != kind:
+            raise ValueError(f"File {path} describes a {root.findtext('type')} machine, expected {kind}.")
+
+        # older files keep states and transitions right under the root, without an automaton element
+        automaton: ElementTree.Element = root.find("automaton")
+        if automaton is None:
+            automaton = root
+
+        labels: Dict[str, str] = {}
+        states: List[Tuple[Union[str, bool], ...]] = []
+        for element in automaton.iter("state"):
+            label: str = element.get("name", f"q{element.get('id')}")
+            labels[element.get("id")] = label
+            state: Tuple[Union[str, bool], ...] = (
+                label, element.find("initial") is not None, element.find("final") is not None
+            )
+            states.append(state + (element.findtext("output") or "",) if kind == "moore" else state)
+
+        transitions: List[Tuple[str, ...]] = []
+        empty: Dict[str, List[str]] = {}  # departure -> arrivals of its λ-transitions
+        for element in automaton.iter("transition"):
+            departure: str = labels[element.findtext("from").strip()]
+            arrival: str = labels[element.findtext("to").strip()]
+            symbol: str = element.findtext("read") or ""
+            if not symbol:
+                if kind != "fa":
+                    raise ValueError(f"Transition from {departure} to {arrival} in {path} consumes no symbol.")
+                empty.setdefault(departure, []).append(arrival)
+                continue
+
+            if kind == "mealy":
+                transitions.append((departure, arrival, symbol, element.findtext("transout") or ""))
+            else:
+                transitions.append((departure, arrival, symbol))
+
+        if not empty:
+            return states, transitions
+
+        # as in ThompsonBuilder.build, a state moves by a symbol wherever any state of its closure does, and is final
+        # if any state of its closure is
+        closures: Dict[str, List[str]] = {}
+        for label, _, _ in states:
+            closure: Dict[str, None] = {label: None}
+            stack: List[str] = [label]
+            while stack:
+                for reached in empty.get(stack.pop(), []):
+                    if reached not in closure:
+                        closure[reached] = None
+                        stack.append(reached)
+            closures[label] = list(closure)
+
+        final: Set[str] = {label for label, _, is_final in states if is_final}
+        outgoing: Dict[str, List[Tuple[str, str]]] = {}
+        for departure, arrival, symbol in transitions:
+            outgoing.setdefault(departure, []).append((arrival, symbol))
+
+        states = [
+            (label, is_initial, any(member in final for member in closures[label])) for label, is_initial, _ in states
+        ]
+        transitions = list(dict.fromkeys(
+            (label, arrival, symbol)
+            for label in closures for member in closures[label] for arrival, symbol in outgoing.get(member, [])
+        ))
+
+        return states, transitions
+
+    @classmethod
+    def from_jff(cls, path: str, alphabet: Union[Alphabet, List[str]] = None, label: str = "M") -> "Automata":
+        """Import a finite automata from a JFLAP .jff file, whose alphabet defaults to the symbols it reads."""
+
+        states, transitions = cls.read_jff(path=path, kind="fa")
+        if alphabet is None:
+            alphabet = list(dict.fromkeys(symbol for _, _, symbol in transitions))
+
+        return cls.from_edges(
+            states=states,
+            transitions=transitions,
+            alphabet=alphabet if isinstance(alphabet, Alphabet) else Alphabet(symbol_labels=alphabet),
+            label=label
+        )
+
+    def determinize(self, verbose: bool = False) -> "Automata":
+        """Equivalent deterministic automata built by subset construction, reused until the next mutation."""
+
+        if self.determinized is None:
+            self.determinized = Automata.from_table(
+                table=self.compile_deterministic(verbose=verbose),
+                label=self.label
+            )
+
+        return self.determinized
+
+    def compile_deterministic(self, verbose: bool = False) -> TransitionTable:
+        """Compiled table of the automata, or its determinized table when there is nondeterminism, reused until the
+        next mutation."""
+
+        if self.deterministic_table is None:
+            table: TransitionTable = self.compile()
+            self.deterministic_table = table if table.deterministic else table.determinize(verbose=verbose)
+
+        return self.deterministic_table
+
+    def compile_acceptor(self) -> TransitionTable:
+        """
+        Table used to accept or reject strings: the deterministic table when it has at most subset_limit states, or
+        the nondeterministic one otherwise, whose runs simulate the set of active states instead.
+        """
+
+        if self.acceptor_table is None:
+            table: TransitionTable = self.compile()
+            if table.deterministic or self.deterministic_table is not None:
+                self.acceptor_table = self.compile_deterministic()
+            else:
+                try:
+                    self.deterministic_table = table.determinize(limit=self.subset_limit)
+                    self.acceptor_table = self.deterministic_table
+                except ValueError:
+                    self.acceptor_table = table
+
+        return self.acceptor_table
+
+    def minimize(self) -> "Automata":
+        """Equivalent deterministic automata with the fewest states, reused until the next mutation."""
+
+        if self.minimized is None:
+            self.minimized = Automata.from_table(table=self.compile_deterministic().minimize(), label=self.label)
+
+        return self.minimized
+
+    def trim(self) -> "Automata":
+        """Equivalent automata without the states that are unreachable or can never lead to acceptance."""
+
+        return type(self).from_table(table=self.compile().trim(), label=self.label)
+
+    def product(self, other: "Automata", combine: Callable[[bool, bool], bool], label: str) -> "Automata":
+        """
+        Deterministic automata that runs both automata in a single pass, built from the reachable pairs of states of
+        their compiled tables. Both alphabets must have the same symbols in the same order.
+        """
+
+        return Automata.from_table(
+            table=self.compile_deterministic().product(other=other.compile_deterministic(), combine=combine),
+            label=label
+        )
+
+    def intersect(self, other: "Automata") -> "Automata":
+        """Automata that accepts the strings accepted by both automata."""
+
+        return self.product(other=other, combine=lambda a, b: a and b, label=f"{self.label}&{other.label}")
+
+    def union(self, other: "Automata") -> "Automata":
+        """Automata that accepts the strings accepted by any of both automata."""
+
+        return self.product(other=other, combine=lambda a, b: a or b, label=f"{self.label}|{other.label}")
+
+    def difference(self, other: "Automata") -> "Automata":
+        """Automata that accepts the strings accepted by this automata but not by the other one."""
+
+        return self.product(other=other, combine=lambda a, b: a and not b, label=f"{self.label}-{other.label}")
+
+    def complete(self) -> "Automata":
+        """Equivalent deterministic automata with a transition for every state and symbol, adding a sink state."""
+
+        automata: Automata = Automata.from_table(table=self.compile_deterministic().complete(), label=self.label)
+        automata.is_total = True
+
+        return automata
+
+    def complement(self) -> "Automata":
+        """Total automata that accepts exactly the strings this automata rejects."""
+
+        automata: Automata = Automata.from_table(table=self.compile_deterministic().complement(), label=f"~{self.label}")
+        automata.is_total = True
+
+        return automata
+
     def check_state_existance(self, label: str) -> int:
         """If a given label exists in the dictionary of states, return its sid."""
 
-        for sid, state in self.states.items():
-            if state.label == label:
-                return sid
-        return -1
+        return self.state_ids.get(label, -1)
+
+    def index_transaction(self, tid: int, departure_sid: int = None, arrival_sid: int = None):
+        """Register a transaction in the indexes by label, by departure and symbol, and by state."""
+
+        transaction: Transaction = self.transactions[tid]
+        if departure_sid is None:
+            departure_sid = self.state_ids[transaction.departure_state.label]
+        if arrival_sid is None:
+            arrival_sid = self.state_ids[transaction.arrival_state.label]
+
+        self.transaction_ids[transaction.label] = tid
+        self.outgoing.setdefault((departure_sid, transaction.symbol.label), []).append(tid)
+        self.state_transactions[departure_sid].add(tid)
+        self.state_transactions[arrival_sid].add(tid)
+
+    def unindex_transaction(self, tid: int):
+        """Remove a transaction from every index, while its label and states are still the indexed ones."""
+
+        transaction: Transaction = self.transactions[tid]
+        departure_sid: int = self.state_ids[transaction.departure_state.label]
+        arrival_sid: int = self.state_ids[transaction.arrival_state.label]
+        key: Tuple[int, str] = (departure_sid, str(transaction.symbol))
+
+        del self.transaction_ids[transaction.label]
+        self.outgoing[key].remove(tid)
+        if not self.outgoing[key]:
+            del self.outgoing[key]
+        self.state_transactions[departure_sid].discard(tid)
+        self.state_transactions[arrival_sid].discard(tid)
 
     def create_state(self, label: str, is_initial: bool = False, is_final: bool = False):
         """Create state and update quintuple."""
 
-        # if given label don't exist
-        if self.check_state_existance(label=label) == -1:
-            # create state and store at current sid position
-            self.states[self.sid] = State(
-                label=label,
-                is_initial=is_initial,
-                is_final=is_final
-            )
+        # inside bulk(), creation waits until the block exits
+        if self.pending_states is not None:
+            self.pending_states.append((label, is_initial, is_final))
+            return
 
-            if is_initial:
-                self.initial_state = self.states[self.sid]  # if initial, it becomes the only initial
+        self.check_state(label, is_initial, is_final)
+        self.insert_state(label=label, is_initial=is_initial, is_final=is_final)
+        self.invalidate()
 
-            if is_final:
-                self.final_states[self.sid] = self.states[self.sid]  # if final, add to the dictionary of final states
+    def check_state(self, label: str, is_initial: bool = False, is_final: bool = False) -> str:
+        """Raise if a state can't be created, otherwise return its label."""
 
-            self.sid += 1
-
-            self.tabular_notation = self.update_tabular_notation()
-        else:
+        if self.check_state_existance(label=label) >= 0:
             raise ValueError(f"A state called {label} already exists.")
 
+        return label
+
+    def check_states(self, states: List[Tuple[Union[str, bool], ...]]) -> List[str]:
+        """Raise if a batch of states can't be created, comparing their whole column of labels at once."""
+
+        labels: List[str] = [state[0] for state in states]
+        unique: Set[str] = set(labels)
+
+        clashes: Set[str] = unique & self.state_ids.keys()
+        if len(unique) < len(labels):
+            clashes.update(label for label, count in Counter(labels).items() if count > 1)
+        if clashes:
+            raise ValueError(f"A state called {sorted(clashes)[0]} already exists.")
+
+        return labels
+
+    def new_state(self, label: str, is_initial: bool, is_final: bool) -> State:
+        """State stored by insert_state, which subclasses override to build their own kind of state."""
+
+        return State(label=label, is_initial=is_initial, is_final=is_final)
+
+    def insert_state(self, label: str, is_initial: bool, is_final: bool, *extra: str):
+        """Store an already validated state at current sid position, passing what subclasses add to new_state."""
+
+        self.states[self.sid] = self.new_state(label, is_initial, is_final, *extra)
+        self.state_ids[label] = self.sid
+        self.state_transactions[self.sid] = set()
+
+        if is_initial:
+            self.initial_state = self.states[self.sid]  # if initial, it becomes the only initial
+
+        if is_final:
+            self.final_states[self.sid] = self.states[self.sid]  # if final, add to the dictionary of final states
+
+        self.sid += 1
+
     def update_state(self, label: str, new_label: str = None, is_initial: bool = None, is_final: bool = None):
         """Update state information and all transactions associated."""
 
@@ -87,32 +520,26 @@ class Automata:
         sid: int = self.check_state_existance(label=label)
 
         if sid >= 0:
+            if new_label and new_label != label and self.check_state_existance(label=new_label) >= 0:
+                raise ValueError(f"A state called {new_label} already exists.")
+
+            # transactions of this state are indexed by its label, so take them out while it is renamed
+            tids: List[int] = list(self.state_transactions[sid])
+            for tid in tids:
+                self.unindex_transaction(tid)
+
             # update state information
-            self.states[sid].label = new_label if new_label else self.states[sid].label
-            self.states[sid].is_initial = is_initial if is_initial else self.states[sid].is_initial
-            self.states[sid].is_final = is_final if is_final else self.states[sid].is_final
+            if new_label:
+                del self.state_ids[label]
+                self.state_ids[new_label] = sid
+                self.states[sid].label = new_label
+            self.states[sid].is_initial = is_initial if is_initial is not None else self.states[sid].is_initial
+            self.states[sid].is_final = is_final if is_final is not None else self.states[sid].is_final
 
             # update transactions
-            for tid in self.transactions.keys():
-                departure_label: str = self.transactions[tid].departure_state.label
-                arrival_label: str = self.transactions[tid].arrival_state.label
-                symbol_label: str = self.transactions[tid].symbol.label
-
-                # if the updated state is a departure, update label
-                if departure_label == new_label:
-                    self.transactions[tid].update_label()
-                    self.update_transaction(
-                        label=f"({departure_label},{symbol_label})->{arrival_label}",
-                        new_departure_label=new_label
-                    )
-
-                # if the updated state is a arrival, update label
-                if arrival_label == new_label:
-                    self.transactions[tid].update_label()
-                    self.update_transaction(
-                        label=f"({departure_label},{symbol_label})->{arrival_label}",
-                        new_arrival_label=new_label
-                    )
+            for tid in tids:
+                self.transactions[tid].update_label()
+                self.index_transaction(tid)
 
             if is_initial is True:
                 self.initial_state = self.states[sid]  # if initial, it becomes the only initial
@@ -126,7 +553,7 @@ class Automata:
                 if sid in self.final_states.keys():
                     del self.final_states[sid]  # if the updated state was final and ceases to be, delete it
 
-            self.tabular_notation: pd.DataFrame = self.update_tabular_notation()
+            self.invalidate()
         else:
             raise ValueError(f"State {label} does not exist.")
 
@@ -143,22 +570,15 @@ class Automata:
             if sid in self.final_states.keys():
                 del self.final_states[sid]  # if the deleted state is final, delete it
 
-            # to remove its transactions, first collect tids of transactions that use this state
-            tids_to_remove: List[int] = []
-            for tid, transaction in self.transactions.items():
-                if transaction.departure_state == self.states[sid] or transaction.arrival_state == self.states[sid]:
-                    tids_to_remove.append(tid)
-
-            # then delete all transactions of this state
-            for tid in tids_to_remove:
-                departure_label: str = self.transactions[tid].departure_state.label
-                arrival_label: str = self.transactions[tid].arrival_state.label
-                symbol_label: str = self.transactions[tid].symbol.label
-                self.delete_transaction(label=f"({departure_label},{symbol_label})->{arrival_label}")
+            # delete all transactions of this state
+            for tid in list(self.state_transactions[sid]):
+                self.delete_transaction(label=self.transactions[tid].label)
 
             del self.states[sid]  # delete state
+            del self.state_ids[label]
+            del self.state_transactions[sid]
 
-            self.tabular_notation = self.update_tabular_notation()
+            self.invalidate()
 
         else:
             raise ValueError(f"State {label} does not exist.")
@@ -172,43 +592,166 @@ class Automata:
     def check_transaction_existance(self, label: str) -> int:
         """If a given label exists in the dictionary of transactions, return its tid."""
 
-        for tid, transaction in self.transactions.items():
-            if transaction.label == label:
-                return tid
-        return -1
+        return self.transaction_ids.get(label, -1)
 
     def create_transaction(self, departure_label: str, arrival_label: str, symbol_label: str):
         """Create transaction and update quintuple"""
 
-        # transaction label indicates a transaction function from qi to qj consuming s: (qi,s)->qj
-        t_label: str = f"({departure_label},{symbol_label})->{arrival_label}"
+        # inside bulk(), creation waits until the block exits
+        if self.pending_transactions is not None:
+            self.pending_transactions.append((departure_label, arrival_label, symbol_label))
+            return
 
-        # if the label don't exist
-        if self.check_transaction_existance(label=t_label) == -1:
-            departure_sid: int = self.check_state_existance(label=departure_label)
-            arrival_sid: int = self.check_state_existance(label=arrival_label)
+        self.check_transaction(departure_label, arrival_label, symbol_label)
+        self.insert_transaction(departure_label, arrival_label, symbol_label)
+        self.invalidate()
 
-            if departure_sid >= 0:
-                if arrival_sid >= 0:
-                    if symbol_label in self.alphabet:
-                        # if the departure and arrival exist and the alphabet contains the alphabet,
-                        # create transaction and store at current tid position
-                        self.transactions[self.tid] = Transaction(
-                            departure_state=self.states[departure_sid],
-                            arrival_state=self.states[arrival_sid],
-                            symbol=Symbol(label=symbol_label)
-                        )
-                        self.tid += 1
-
-                        self.tabular_notation = self.update_tabular_notation()
-                    else:
-                        raise ValueError(f"Symbol {symbol_label} does not exist in alphabet.")
+    def check_transaction(self, departure_label: str, arrival_label: str, symbol_label: str) -> str:
+        """Raise if a transaction can't be created, otherwise return its label."""
+
+        t_label: str = self.transaction_label(departure_label, arrival_label, symbol_label)
+
+        if self.check_transaction_existance(label=t_label) >= 0:
+            raise ValueError(
+                f"A transaction from {departure_label} to {arrival_label} consuming {symbol_label} already exists."
+            )
+        if self.check_state_existance(label=departure_label) == -1:
+            raise ValueError(f"State {departure_label} does not exist in list of states.")
+        if self.check_state_existance(label=arrival_label) == -1:
+            raise ValueError(f"State {arrival_label} does not exist in list of states.")
+        if symbol_label not in self.alphabet:
+            raise ValueError(f"Symbol {symbol_label} does not exist in alphabet.")
+
+        return t_label
+
+    @staticmethod
+    def transaction_label(departure_label: str, arrival_label: str, symbol_label: str) -> str:
+        """Label of a transaction function from qi to qj consuming s: (qi,s)->qj."""
+
+        return f"({departure_label},{symbol_label})->{arrival_label}"
+
+    def check_transactions(self, transactions: List[Tuple[str, ...]]) -> List[str]:
+        """
+        Raise if a batch of transactions can't be created, comparing their whole columns of states and symbols with
+        set operations instead of checking them one by one, otherwise return their labels.
+        """
+
+        if not transactions:
+            return []
+        columns: List[Tuple[str, ...]] = list(zip(*transactions))
+
+        missing: Set[str] = (set(columns[0]) | set(columns[1])) - self.state_ids.keys()
+        if missing:
+            raise ValueError(f"State {sorted(missing)[0]} does not exist in list of states.")
+        unknown: Set[str] = set(columns[2]) - self.alphabet.index.keys()
+        if unknown:
+            raise ValueError(f"Symbol {sorted(unknown)[0]} does not exist in alphabet.")
+
+        t_labels: List[str] = [self.transaction_label(*transaction) for transaction in transactions]
+        unique: Set[str] = set(t_labels)
+        if len(unique) < len(t_labels):
+            duplicated: str = next(label for label, count in Counter(t_labels).items() if count > 1)
+            raise ValueError(f"Transaction {duplicated} is duplicated.")
+        clashes: Set[str] = unique & self.transaction_ids.keys()
+        if clashes:
+            raise ValueError(f"Transaction {sorted(clashes)[0]} already exists.")
+
+        return t_labels
+
+    def new_transaction(
+            self, departure_state: State, arrival_state: State, symbol_label: str, label: str = None
+    ) -> Transaction:
+        """Transaction stored by insert_transaction, which subclasses override to build their own kind of it."""
+
+        return Transaction(
+            departure_state=departure_state, arrival_state=arrival_state, symbol=Symbol.intern(label=symbol_label),
+            label=label
+        )
+
+    def insert_transaction(
+            self, departure_label: str, arrival_label: str, symbol_label: str, *extra: str, t_label: str = None
+    ):
+        """
+        Store an already validated transaction at current tid position, passing what subclasses add to new_transaction
+        and reusing its label when already formatted.
+        """
+
+        departure_sid: int = self.state_ids[departure_label]
+        arrival_sid: int = self.state_ids[arrival_label]
+        self.transactions[self.tid] = self.new_transaction(
+            self.states[departure_sid], self.states[arrival_sid], symbol_label, *extra, label=t_label
+        )
+        self.index_transaction(self.tid, departure_sid=departure_sid, arrival_sid=arrival_sid)
+        self.tid += 1
+
+    @contextmanager
+    def bulk(self) -> Iterator["Automata"]:
+        """Defer creation of states and transactions until the block exits, then validate and insert them at once."""
+
+        # nested blocks join the outermost one
+        if self.pending_states is not None:
+            yield self
+            return
+
+        self.pending_states, self.pending_transactions = [], []
+        try:
+            yield self
+            states, transactions = self.pending_states, self.pending_transactions
+        finally:
+            self.pending_states, self.pending_transactions = None, None
+
+        self.insert_pending(states=states, transactions=transactions)
+
+    def insert_pending(self, states: List[Tuple[str, bool, bool]], transactions: List[Tuple[str, ...]]):
+        """Validate and insert a batch of states and transactions, leaving the automata untouched on error."""
+
+        # states are validated against existing ones and against each other
+        labels: List[str] = self.check_states(states)
+
+        sid: int = self.sid
+        initial_state: State = self.initial_state
+        for state in states:
+            self.insert_state(*state)
+
+        # transactions are validated once every state exists, and rolled back with the states on error
+        try:
+            t_labels: List[str] = self.check_transactions(transactions)
+        except ValueError:
+            for label in labels:
+                self.delete_state(label=label)
+            self.sid = sid
+            self.initial_state = initial_state
+            raise
+
+        for transaction, t_label in zip(transactions, t_labels):
+            self.insert_transaction(*transaction, t_label=t_label)
+
+        self.invalidate()
+
+    def extend(self, states: Iterable[Union[str, Tuple[str, bool, bool]]], transactions: Iterable[Tuple[str, ...]]):
+        """Create states, given as labels or (label, is_initial, is_final), and transactions in one pass."""
+
+        with self.bulk():
+            for state in states:
+                if isinstance(state, str):
+                    self.create_state(label=state)
                 else:
-                    raise ValueError(f"State {arrival_label} does not exist in list of states.")
-            else:
-                raise ValueError(f"State {departure_label} does not exist in list of states.")
-        else:
-            raise ValueError(f"A transaction from {departure_label} to {arrival_label} consuming {symbol_label} already exists.")
+                    self.create_state(*state)
+
+            for transaction in transactions:
+                self.create_transaction(*transaction)
+
+    @classmethod
+    def from_edges(
+            cls, states: Iterable[Union[str, Tuple[str, bool, bool]]], transitions: Iterable[Tuple[str, str, str]],
+            alphabet: Alphabet, label: str = "M"
+    ) -> "Automata":
+        """Create an automata from states and (departure, arrival, symbol) transitions in one pass."""
+
+        automata: Automata = cls(label=label, alphabet=alphabet)
+        automata.extend(states=states, transactions=transitions)
+
+        return automata
 
     def update_transaction(
             self, label: str, new_departure_label: str = None, new_arrival_label: str = None, new_symbol_label: str = None
@@ -219,6 +762,8 @@ class Automata:
         tid: int = self.check_transaction_existance(label=label)
 
         if tid >= 0:
+            self.unindex_transaction(tid)
+
             # update transaction information
             departure_sid: int = self.check_state_existance(label=new_departure_label)
             arrival_sid: int = self.check_state_existance(label=new_arrival_label)
@@ -235,12 +780,24 @@ class Automata:
 
             # update symbol, if provided
             if new_symbol_label in self.alphabet:
-                self.transactions[tid].symbol.label = new_symbol_label
+                self.transactions[tid].symbol = Symbol.intern(label=new_symbol_label)
 
-            self.tabular_notation = self.update_tabular_notation()
+            self.reindex_transaction(tid=tid)
+
+            self.invalidate()
         else:
             raise ValueError(f"The transaction {label} doesn't exist.")
 
+    def reindex_transaction(self, tid: int):
+        """Index an updated transaction again, merging it into an identical transaction if there is one."""
+
+        self.transactions[tid].update_label()
+
+        if self.check_transaction_existance(label=self.transactions[tid].label) >= 0:
+            del self.transactions[tid]
+        else:
+            self.index_transaction(tid)
+
     def delete_transaction(self, label: str):
         """Delete transaction and update quintuple."""
 
@@ -248,9 +805,10 @@ class Automata:
         tid: int = self.check_transaction_existance(label=label)
 
         if tid >= 0:
+            self.unindex_transaction(tid)
             del self.transactions[tid]  # delete transaction
 
-            self.tabular_notation = self.update_tabular_notation()
+            self.invalidate()
         else:
             raise ValueError(f"The transaction {label} doesn't exist.")
 
@@ -263,39 +821,73 @@ class Automata:
     def get_transactions(self, current_sid: int, current_cursor: int, string: str) -> List[Transaction]:
         """List all available transactions from current state."""
 
-        current_available_transactions: List[Transaction] = []
+        # no transaction is available once the string is over
+        if current_cursor >= len(string):
+            return []
 
-        for transaction in self.transactions.values():
-            try:
-                if transaction.departure_state.label == self.states[current_sid].label:
-                    if transaction.symbol == string[current_cursor]:
-                        current_available_transactions.append(transaction)
-            except IndexError as e:
-                return []
+        tids: List[int] = self.outgoing.get((current_sid, string[current_cursor]), [])
+
+        return [self.transactions[tid] for tid in tids]
+
+    def choose_transaction(self, available_transactions: List[Transaction], viable: Set[int]) -> Transaction:
+        """Choose the first available transaction whose arrival state can still accept the rest of the string."""
+
+        index: Dict[str, int] = self.compile().index
+
+        for transaction in available_transactions:
+            if index[transaction.arrival_state.label] in viable:
+                return transaction
+
+        # no path accepts, so any choice leads to rejection
+        return available_transactions[0]
 
-        return current_available_transactions
+    def recognize(self, string: str, verbose: bool = False, tracer: Tracer = None) -> bool:
+        """
+        Process a string of symbols and return a boolean to indicate acception and rejection. Runs are only traced,
+        and slower, when given a tracer, or when verbose, which prints each configuration.
+        """
 
-    def recognize(self, string: str, verbose: bool = False) -> bool:
-        """Process a string of symbols and return a boolean to indicate acception and rejection."""
+        # run over the compiled table, determinized when there is nondeterminism unless it has too many subsets
+        if tracer is None and not verbose:
+            table: TransitionTable = self.compile_acceptor()
+            if self.prefix_capacity and table.deterministic:
+                if self.prefix_cache is None:
+                    self.prefix_cache = PrefixCache(table=table, capacity=self.prefix_capacity)
+                return self.prefix_cache.accepts(string)
+            return table.accepts(string)
+
+        return self.trace(string=string, tracer=tracer if tracer is not None else PrintTracer())
+
+    def trace(self, string: Sequence[str], tracer: Tracer) -> bool:
+        """Walk the states one transaction at a time, reporting the run to a tracer, and return acceptance."""
+
+        if self.initial_state is None:
+            tracer.start(string=string, state=None)
+            tracer.finish(position=0, state=None, accepted=False)
+            return False
 
         # declare initial setting
         cursor: int = 0
-        sid: int = self.check_state_existance(label=self.initial_state.label) if self.initial_state else None
+        viable: List[Set[int]] = self.compile().viable(string=string)
+        sid: int = self.check_state_existance(label=self.initial_state.label)
         available_transactions: List[Transaction] = self.get_transactions(
             current_sid=sid,
             current_cursor=cursor,
             string=string
         )
 
-        if verbose:
-            print(f"({self.states[sid].label},{string[cursor:]})", end=' -| ')
+        tracer.start(string=string, state=self.states[sid])
 
         # while the string has symbols left and there is available transactions
         while cursor <= len(string) and len(available_transactions) > 0:
 
-            # choose a transaction from the list of chosen transactions
-            chosen_id: int = randint(0, len(available_transactions)-1)
-            chosen_transaction = available_transactions[chosen_id]
+            # choose a transaction that can still lead to acceptance, the same one on every run
+            chosen_transaction = self.choose_transaction(
+                available_transactions=available_transactions,
+                viable=viable[cursor + 1]
+            )
+
+            tracer.step(position=cursor, transaction=chosen_transaction, choices=len(available_transactions))
 
             cursor += 1  # move the cursor
 
@@ -309,16 +901,136 @@ class Automata:
                 string=string
             )
 
-            if verbose:
-                print(f"({self.states[sid].label},{string[cursor:]})", end=' -| ')
-
         # if it reached a final state and there is no more symbols to consume, then accept, otherwise reject
-        if self.states[sid].is_final and cursor >= len(string):
-            if verbose:
-                print(f"({self.states[sid].label},{None})")
-            return True
-        return False
+        accepted: bool = self.states[sid].is_final and cursor >= len(string)
+        tracer.finish(position=cursor, state=self.states[sid], accepted=accepted)
+
+        return accepted
+
+    def recognize_codes(self, codes: Sequence[int]) -> bool:
+        """Process a string encoded by Alphabet.encode and return a boolean to indicate acception and rejection."""
+
+        return self.compile_acceptor().accepts_codes(codes)
+
+    def recognize_many(
+            self, strings: Iterable[str], workers: int = None, chunksize: int = 10000, executor: Executor = None,
+            key: int = 0
+    ) -> np.ndarray:
+        """
+        Process many strings at once, in parallel with workers > 1, and return an array of booleans. A running executor
+        is reused instead, see TransitionTable.accepts_many.
+        """
+
+        # compile once, and ship only the table to the workers
+        return self.compile_acceptor().accepts_many(
+            strings=strings, workers=workers, chunksize=chunksize, executor=executor, key=key
+        )
+
+    def recognize_sorted(self, strings: Iterable[Sequence[str]]) -> np.ndarray:
+        """
+        Process many strings in sorted order, consuming each prefix they share once, and return an array of booleans
+        in the input order.
+        """
+
+        return self.compile_deterministic().accepts_sorted(strings=strings)
+
+    def cache_prefixes(self, capacity: int = 4096):
+        """Make recognize remember the states reached after up to capacity prefixes, or stop it with 0."""
+
+        self.prefix_capacity = capacity
+        self.prefix_cache = None
+
+    def recognize_batch(self, strings: Union[np.ndarray, Sequence[Sequence[str]]]) -> np.ndarray:
+        """
+        Process many strings with vectorized lookups and return an array of booleans. Strings are either a matrix of
+        codes in the order of the alphabet of the automata, as made by Alphabet.encode or by iterate_string_blocks with
+        symbols=alphabet, one string per row, or a sequence of strings encoded by groups of equal length.
+        """
+
+        table: TransitionTable = self.compile_deterministic()
+
+        if isinstance(strings, np.ndarray):
+            return table.accepts_batch(codes=strings)
 
+        lengths: np.ndarray = np.fromiter((len(string) for string in strings), dtype=np.int64, count=len(strings))
+        results: np.ndarray = np.zeros(len(strings), dtype=bool)
+
+        for length in np.unique(lengths).tolist():
+            rows: List[int] = np.flatnonzero(lengths == length).tolist()
+            group: List[Sequence[str]] = [strings[i] for i in rows]
+
+            # python strings have one code per character, so a whole group is encoded at once
+            if all(isinstance(string, str) for string in group):
+                codes: np.ndarray = self.alphabet.encode("".join(group)).reshape(len(rows), length)
+            else:
+                codes = np.array([self.alphabet.encode(string) for string in group], dtype=np.int32)
+                codes = codes.reshape(len(rows), length)
+            results[rows] = table.accepts_batch(codes=codes)
+
+        return results
+
+    def reset(self, encoding: str = "utf-8"):
+        """Start a new stream of input at the initial state, decoding bytes chunks with the given encoding."""
+
+        self.stream_table = self.compile_acceptor()
+        self.stream_states = self.stream_table.start()
+        self.stream_decoder = codecs.getincrementaldecoder(encoding)()
+
+    def feed(self, chunk: Union[str, bytes, Sequence[str]]) -> bool:
+        """
+        Consume the next chunk of a stream and tell whether the input seen so far is accepted. A stream is started on
+        the first chunk, and must be restarted with reset() after the automata is changed.
+        """
+
+        if self.stream_table is None:
+            self.reset()
+        elif self.stream_table is not self.compile_acceptor():
+            raise ValueError(f"Automata {self.label} changed since the stream was started, call reset() first.")
+
+        # bytes are decoded incrementally, so a character split between two chunks is kept for the next one
+        if isinstance(chunk, (bytes, bytearray, memoryview, mmap)):
+            chunk = self.stream_decoder.decode(chunk)
+
+        self.stream_states = self.stream_table.advance(states=self.stream_states, string=chunk)
+
+        return self.stream_table.accepting(self.stream_states)
+
+    def run(
+            self, source: Union[bytes, mmap, Iterable[Union[str, bytes, Sequence[str]]]],
+            chunk_size: int = 65536, encoding: str = "utf-8"
+    ) -> bool:
+        """Process a stream of chunks, or a bytes-like source such as a mmap read in slices, in constant memory."""
+
+        self.reset(encoding=encoding)
+
+        if isinstance(source, (bytes, bytearray, memoryview, mmap)):
+            view: memoryview = memoryview(source)
+            source = (view[start:start + chunk_size] for start in range(0, len(view), chunk_size))
+        elif isinstance(source, str):
+            source = (source,)
+
+        accepted: bool = self.stream_table.accepting(self.stream_states)
+        for chunk in source:
+            accepted = self.feed(chunk)
+
+            # once no state is active, the rest of the input can't change the answer
+            if not self.stream_states:
+                return False
+
+        # an incomplete character at the end of the input raises here
+        self.stream_decoder.decode(b"", final=True)
+
+        return accepted
+
+    def enumerate_language(self, max_length: int) -> Iterator[str]:
+        """Yield every accepted string of up to max_length symbols in shortlex order, without testing rejected ones."""
+
+        return self.compile_deterministic().words(max_length=max_length)
+
+    def count_words(self, length: int) -> int:
+        """Count the accepted strings of exactly length symbols."""
+
+        return self.compile_deterministic().count(length=length)
 
     def __str__(self):
         Q: str = ', '.join([str(state) for state in self.states.values()])
@@ -331,12 +1043,43 @@ class Automata:
 
 
 class Transducer(Automata):
+    table_class: type = MealyTable
+
     def __init__(self, label: str, alphabet: Alphabet, output_alphabet: Alphabet):
         super().__init__(label=label, alphabet=alphabet)
         self.output_alphabet: Alphabet = output_alphabet
         self.transactions: Dict[str, MealyTransaction] = {}
 
-        self.output_tabular_notation: pd.DataFrame() = self.update_output_tabular_notation()
+        self.output_tabular_cache: pd.DataFrame = None  # built on demand by output_tabular_notation
+
+    @property
+    def output_tabular_notation(self) -> pd.DataFrame:
+        """Dataframe of outputs built on first access after a mutation, instead of on every mutation."""
+
+        if self.output_tabular_cache is None:
+            self.output_tabular_cache = self.update_output_tabular_notation()
+        return self.output_tabular_cache
+
+    def invalidate(self):
+        """Discard every structure derived from the quintuple, so it is rebuilt when needed again."""
+
+        super().invalidate()
+        self.output_tabular_cache = None
+
+    def compile(self) -> MealyTable:
+        """Build the integer-indexed transition and output tables, reused until the next mutation."""
+
+        if self.compiled_table is None:
+            output_symbols: List[str] = [str(symbol) for symbol in self.output_alphabet]
+            output_index: Dict[str, int] = {symbol: i for i, symbol in enumerate(output_symbols)}
+
+            self.compiled_table = MealyTable(
+                **self.table_arguments(),
+                output_symbols=output_symbols,
+                outputs=[output_index[str(transaction.output)] for transaction in self.transactions.values()]
+            )
+
+        return self.compiled_table
 
     def update_output_tabular_notation(self) -> pd.DataFrame:
         """Dataframe that describes general information for all states."""
@@ -348,56 +1091,123 @@ class Transducer(Automata):
             "state": [state.label for state in self.states.values()],
         }
 
-        for symbol in self.alphabet:
-            symbol_transactions: Dict[str, List[str]] = {state: [] for state in data["state"]}
-            for transaction in self.transactions.values():
-                if transaction.symbol == symbol:
-                    symbol_transactions[transaction.departure_state.label].append(transaction.output.label)
-            data[str(symbol)] = [arrival_states for arrival_states in symbol_transactions.values()]
+        # a single pass over transactions fills the cell of its departure state under its symbol column
+        row: Dict[str, int] = {label: i for i, label in enumerate(data["state"])}
+        columns: Dict[str, List[List[str]]] = {str(symbol): [[] for _ in row] for symbol in self.alphabet}
+        for transaction in self.transactions.values():
+            columns[str(transaction.symbol)][row[transaction.departure_state.label]].append(str(transaction.output))
+        data.update(columns)
 
         return pd.DataFrame(data=data)
 
+    @classmethod
+    def from_edges(
+            cls, states: Iterable[Union[str, Tuple[str, bool, bool]]], transitions: Iterable[Tuple[str, str, str, str]],
+            alphabet: Alphabet, output_alphabet: Alphabet, label: str = "M"
+    ) -> "Transducer":
+        """Create a transducer from states and (departure, arrival, symbol, output) transitions in one pass."""
+
+        transducer: Transducer = cls(label=label, alphabet=alphabet, output_alphabet=output_alphabet)
+        transducer.extend(states=states, transactions=transitions)
+
+        return transducer
+
+    @classmethod
+    def table_transitions(cls, table: MealyTable) -> List[Tuple[str, ...]]:
+        """Transitions of a compiled Mealy table, with the output each one generates."""
+
+        outputs: List[int] = np.asarray(table.outputs).tolist()
+        return [
+            transition + (table.output_symbols[output],)
+            for transition, output in zip(super().table_transitions(table=table), outputs)
+        ]
+
+    @classmethod
+    def table_alphabets(cls, table: MealyTable) -> Dict[str, Alphabet]:
+        """Alphabets of a compiled Mealy table, including the output one."""
+
+        return {**super().table_alphabets(table=table), "output_alphabet": Alphabet(symbol_labels=table.output_symbols)}
+
+    @classmethod
+    def from_jff(
+            cls, path: str, alphabet: Union[Alphabet, List[str]] = None,
+            output_alphabet: Union[Alphabet, List[str]] = None, label: str = "M"
+    ) -> "Transducer":
+        """Import a Mealy machine from a JFLAP .jff file, whose alphabets default to the symbols it reads and writes."""
+
+        states, transitions = cls.read_jff(path=path, kind="mealy")
+        if alphabet is None:
+            alphabet = list(dict.fromkeys(symbol for _, _, symbol, _ in transitions))
+        if output_alphabet is None:
+            output_alphabet = list(dict.fromkeys(output for _, _, _, output in transitions))
+
+        return cls.from_edges(
+            states=states,
+            transitions=transitions,
+            alphabet=alphabet if isinstance(alphabet, Alphabet) else Alphabet(symbol_labels=alphabet),
+            output_alphabet=(
+                output_alphabet if isinstance(output_alphabet, Alphabet) else Alphabet(symbol_labels=output_alphabet)
+            ),
+            label=label
+        )
+
     def create_transaction(self, departure_label: str, arrival_label: str, symbol_label: str, output_label: str):
         """Create transaction and update quintuple"""
 
-        # transaction label indicates a transaction function from qi to qj consuming s: (qi,s)->qj
-        t_label: str = f"({departure_label},{symbol_label}/{output_label})->{arrival_label}"
+        # inside bulk(), creation waits until the block exits
+        if self.pending_transactions is not None:
+            self.pending_transactions.append((departure_label, arrival_label, symbol_label, output_label))
+            return
 
-        # if the label don't exist
-        if self.check_transaction_existance(label=t_label) == -1:
-            departure_sid: int = self.check_state_existance(label=departure_label)
-            arrival_sid: int = self.check_state_existance(label=arrival_label)
+        self.check_transaction(departure_label, arrival_label, symbol_label, output_label)
+        self.insert_transaction(departure_label, arrival_label, symbol_label, output_label)
+        self.invalidate()
 
-            if departure_sid >= 0:
-                if arrival_sid >= 0:
-                    if symbol_label in self.alphabet:
-                        if output_label in self.output_alphabet:
-                            # if the departure and arrival exist and the alphabet contains the alphabet and
-                            # the output_alphabet contains the output,
-                            # create transaction and store at current tid position
-                            self.transactions[self.tid] = MealyTransaction(
-                                departure_state=self.states[departure_sid],
-                                arrival_state=self.states[arrival_sid],
-                                symbol=Symbol(label=symbol_label),
-                                output=Symbol(label=output_label)
-                            )
-                            self.tid += 1
-
-                            self.tabular_notation = self.update_tabular_notation()
-                            self.output_tabular_notation = self.update_output_tabular_notation()
-                        else:
-                            raise ValueError(f"Output {output_label} does not exist in output alphabet.")
-                    else:
-                        raise ValueError(f"Symbol {symbol_label} does not exist in alphabet.")
-                else:
-                    raise ValueError(f"State {arrival_label} does not exist in list of states.")
-            else:
-                raise ValueError(f"State {departure_label} does not exist in list of states.")
-        else:
+    def check_transaction(self, departure_label: str, arrival_label: str, symbol_label: str, output_label: str) -> str:
+        """Raise if a transaction can't be created, otherwise return its label."""
+
+        t_label: str = self.transaction_label(departure_label, arrival_label, symbol_label, output_label)
+
+        if self.check_transaction_existance(label=t_label) >= 0:
             raise ValueError(
                 f"A transaction from {departure_label} to {arrival_label} " +
                 f"consuming {symbol_label} and generating {output_label} already exists."
             )
+        if self.check_state_existance(label=departure_label) == -1:
+            raise ValueError(f"State {departure_label} does not exist in list of states.")
+        if self.check_state_existance(label=arrival_label) == -1:
+            raise ValueError(f"State {arrival_label} does not exist in list of states.")
+        if symbol_label not in self.alphabet:
+            raise ValueError(f"Symbol {symbol_label} does not exist in alphabet.")
+        if output_label not in self.output_alphabet:
+            raise ValueError(f"Output {output_label} does not exist in output alphabet.")
+
+        return t_label
+
+    @staticmethod
+    def transaction_label(departure_label: str, arrival_label: str, symbol_label: str, output_label: str) -> str:
+        """Label of a transaction function from qi to qj consuming s and generating o: (qi,s/o)->qj."""
+
+        return f"({departure_label},{symbol_label}/{output_label})->{arrival_label}"
+
+    def check_transactions(self, transactions: List[Tuple[str, ...]]) -> List[str]:
+        """Raise if a batch of transactions can't be created, checking their outputs as a column as well."""
+
+        unknown: Set[str] = {transaction[3] for transaction in transactions} - self.output_alphabet.index.keys()
+        if unknown:
+            raise ValueError(f"Output {sorted(unknown)[0]} does not exist in output alphabet.")
+
+        return super().check_transactions(transactions)
+
+    def new_transaction(
+            self, departure_state: State, arrival_state: State, symbol_label: str, output_label: str, label: str = None
+    ) -> MealyTransaction:
+        """Transaction generating an output."""
+
+        return MealyTransaction(
+            departure_state=departure_state, arrival_state=arrival_state, symbol=Symbol.intern(label=symbol_label),
+            output=Symbol.intern(label=output_label), label=label
+        )
 
     def update_transaction(
             self, label: str, new_departure_label: str = None, new_arrival_label: str = None,
@@ -409,6 +1219,8 @@ class Transducer(Automata):
         tid: int = self.check_transaction_existance(label=label)
 
         if tid >= 0:
+            self.unindex_transaction(tid)
+
             # update transaction information
             departure_sid: int = self.check_state_existance(label=new_departure_label)
             arrival_sid: int = self.check_state_existance(label=new_arrival_label)
@@ -425,106 +1237,269 @@ class Transducer(Automata):
 
             # update symbol, if provided
             if new_symbol_label in self.alphabet:
-                self.transactions[tid].symbol = new_symbol_label
+                self.transactions[tid].symbol = Symbol.intern(label=new_symbol_label)
 
             # update output, if provided
             if new_output_label in self.output_alphabet:
-                self.transactions[tid].output = new_output_label
+                self.transactions[tid].output = Symbol.intern(label=new_output_label)
 
-            self.tabular_notation = self.update_tabular_notation()
-            self.output_tabular_notation = self.update_output_tabular_notation()
+            self.reindex_transaction(tid=tid)
+
+            self.invalidate()
         else:
             raise ValueError(f"The transaction {label} doesn't exist.")
 
-    def recognize(self, string: str, verbose: bool = False) -> bool:
+    def recognize(self, string: str, verbose: bool = False, tracer: Tracer = None) -> bool:
+        """
+        Process a string of symbols and return a boolean to indicate acception and rejection. When verbose, the output
+        generated by each transaction is printed.
+        """
 
-        # declare initial setting
-        cursor: int = 0
-        sid: int = self.check_state_existance(label=self.initial_state.label) if self.initial_state else None
-        available_transactions: List[MealyTransaction] = self.get_transactions(
-            current_sid=sid,
-            current_cursor=cursor,
-            string=string
-        )
+        if tracer is None and verbose:
+            tracer = OutputPrintTracer()
 
-        # if verbose:
-        #     print(f"({self.states[sid].label},{string[cursor:]})", end=' -| ')
+        return super().recognize(string=string, tracer=tracer)
 
-        # while the string has symbols left and there is available transactions
-        while cursor <= len(string) and len(available_transactions) > 0:
+    def compile_mealy(self) -> MealyTable:
+        """Compiled table of the transducer, which must be deterministic to generate a single output."""
 
-            # choose a transaction from the list of chosen transactions
-            chosen_id: int = randint(0, len(available_transactions) - 1)
-            chosen_transaction = available_transactions[chosen_id]
+        table: MealyTable = self.compile()
+        if not table.deterministic:
+            raise ValueError(f"Transducer {self.label} must be deterministic to generate outputs.")
 
-            print(chosen_transaction.output)
+        return table
 
-            cursor += 1  # move the cursor
+    def translate(self, string: Sequence[str]) -> str:
+        """Return the outputs generated while consuming a string, instead of printing them."""
 
-            # move to the sid indicated by the chosen transaction
-            sid = self.check_state_existance(label=chosen_transaction.arrival_state.label)
+        return self.compile_mealy().translate(string)
 
-            # update the list of available transactions of the chosen state
-            available_transactions: List[Transaction] = self.get_transactions(
-                current_sid=sid,
-                current_cursor=cursor,
-                string=string
+    def translate_bytes(self, string: Sequence[str], encoding: str = "utf-8") -> bytes:
+        """Return the encoded outputs generated while consuming a string."""
+
+        return self.compile_mealy().translate_bytes(string, encoding=encoding)
+
+    def translate_codes(self, string: Sequence[str]) -> np.ndarray:
+        """Return the index in the output alphabet of the output generated by each symbol of a string."""
+
+        return self.compile_mealy().translate_codes(string)
+
+    def finditer(self, string: Sequence[str]) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, output) for every non-empty output generated in a single pass over the string, where end
+        follows the symbol that generated it and start is where the shortest run generating it left the initial state.
+        """
+
+        return self.compile_mealy().finditer(string)
+
+    def match(self, string: str, word: str, verbose: bool = False, tracer: MatchTracer = None) -> bool:
+        """
+        Walk the string and collect in a tracer, or print when verbose, the initial position of every occurence of a
+        word inside it, for transducers that output on the delimiter following the word. finditer yields those outputs
+        as (start, end, output) without tracing, where start is the delimiter before the word, and the position is
+        end - 1 - len(word).
+        """
+
+        if tracer is None:
+            tracer = MatchTracer(word=word, verbose=verbose)
+
+        return self.trace(string=string, tracer=tracer)
+
+    def __str__(self):
+        Q: str = ', '.join([str(state) for state in self.states.values()])
+        S: str = ', '.join([str(symbol) for symbol in self.alphabet])
+        D: str = ', '.join([str(symbol) for symbol in self.output_alphabet])
+        d: str = ', '.join([str(transaction) for transaction in self.transactions.values()])
+        l: str = ', '.join([str(transaction) for transaction in self.transactions.values()])
+        s0: str = str(self.initial_state)
+        F: str = ', '.join([str(state) for state in self.final_states.values()])
+
+        return f"""{self.label} = (\n\t{{{Q}}},\n\t{{{S}}},\n\t{{{d}}},\n\t{s0},\n\t{{{F}}}\n)"""
+
+
+class MooreMachine(Automata):
+    """Automata whose states generate an output symbol each time they are entered."""
+
+    table_class: type = MooreTable
+
+    def __init__(self, label: str, alphabet: Union[Alphabet, List[str]], output_alphabet: Union[Alphabet, List[str]]):
+        super().__init__(label=label, alphabet=alphabet)
+        self.output_alphabet: Alphabet = (
+            output_alphabet if isinstance(output_alphabet, Alphabet) else Alphabet(symbol_labels=output_alphabet)
+        )
+        self.states: Dict[int, MooreState] = {}
+
+    def compile(self) -> MooreTable:
+        """Build the integer-indexed transition table and the output of each state, reused until the next mutation."""
+
+        if self.compiled_table is None:
+            output_symbols: List[str] = [str(symbol) for symbol in self.output_alphabet]
+            output_index: Dict[str, int] = {symbol: i for i, symbol in enumerate(output_symbols)}
+
+            self.compiled_table = MooreTable(
+                **self.table_arguments(),
+                output_symbols=output_symbols,
+                state_outputs=[output_index[str(state.output)] for state in self.states.values()]
             )
 
-            # if verbose:
-            #     print(f"({self.states[sid].label},{string[cursor:]})", end=' -| ')
+        return self.compiled_table
 
-        if self.states[sid].is_final and cursor >= len(string):
-            # if verbose:
-            #     print(f"({self.states[sid].label},{None})")
-            return True
-        print(self.states[sid], string[cursor])
-        return False
+    def update_tabular_notation(self) -> pd.DataFrame:
+        """Dataframe that describes general information for all states, including their output."""
 
-    def match(self, string: str, word: str):
-        """Collect the initial and final positions for all occurences of substring inside the string."""
+        tabular_notation: pd.DataFrame = super().update_tabular_notation()
+        tabular_notation.insert(4, "output", [str(state.output) for state in self.states.values()])
 
-        # declare initial setting
-        cursor: int = 0
-        sid: int = self.check_state_existance(label=self.initial_state.label) if self.initial_state else None
-        available_transactions: List[MealyTransaction] = self.get_transactions(
-            current_sid=sid,
-            current_cursor=cursor,
-            string=string
+        return tabular_notation
+
+    @classmethod
+    def table_states(cls, table: MooreTable) -> List[Tuple[Union[str, bool], ...]]:
+        """States of a compiled Moore table, with the output each one generates."""
+
+        return [
+            state + (table.output_symbols[output],)
+            for state, output in zip(super().table_states(table=table), table.output_list)
+        ]
+
+    @classmethod
+    def table_alphabets(cls, table: MooreTable) -> Dict[str, Alphabet]:
+        """Alphabets of a compiled Moore table, including the output one."""
+
+        return {**super().table_alphabets(table=table), "output_alphabet": Alphabet(symbol_labels=table.output_symbols)}
+
+    @classmethod
+    def from_edges(
+            cls, states: Iterable[Union[str, Tuple[Union[str, bool], ...]]],
+            transitions: Iterable[Tuple[str, str, str]], alphabet: Alphabet, output_alphabet: Alphabet, label: str = "M"
+    ) -> "MooreMachine":
+        """Create a Moore machine from (label, is_initial, is_final, output) states and transitions in one pass."""
+
+        machine: MooreMachine = cls(label=label, alphabet=alphabet, output_alphabet=output_alphabet)
+        machine.extend(states=states, transactions=transitions)
+
+        return machine
+
+    @classmethod
+    def from_transducer(cls, transducer: Transducer, label: str = None) -> "MooreMachine":
+        """
+        Equivalent Moore machine of a Mealy transducer, splitting each state by the output generated on entering it.
+        The initial state generates the first output symbol, which is never translated.
+        """
+
+        return cls.from_table(table=transducer.compile().to_moore(), label=label or transducer.label)
+
+    @classmethod
+    def from_jff(
+            cls, path: str, alphabet: Union[Alphabet, List[str]] = None,
+            output_alphabet: Union[Alphabet, List[str]] = None, label: str = "M"
+    ) -> "MooreMachine":
+        """Import a Moore machine from a JFLAP .jff file, whose alphabets default to the symbols it reads and writes."""
+
+        states, transitions = cls.read_jff(path=path, kind="moore")
+        if alphabet is None:
+            alphabet = list(dict.fromkeys(symbol for _, _, symbol in transitions))
+        if output_alphabet is None:
+            output_alphabet = list(dict.fromkeys(output for _, _, _, output in states))
+
+        return cls.from_edges(
+            states=states, transitions=transitions, alphabet=alphabet, output_alphabet=output_alphabet, label=label
         )
 
-        # while the string has symbols left and there is available transactions
-        while cursor <= len(string) and len(available_transactions) > 0:
-            # choose a transaction from the list of chosen transactions
-            chosen_id: int = randint(0, len(available_transactions) - 1)
-            chosen_transaction = available_transactions[chosen_id]
+    def to_transducer(self) -> Transducer:
+        """Equivalent Mealy transducer, where each transition generates the output of the state it enters."""
 
-            if chosen_transaction.output == "#":
-                print(f"Position: {cursor}-{len(word)}={cursor - len(word)}")
+        return Transducer.from_table(table=self.compile().to_mealy(), label=self.label)
 
-            cursor += 1  # move the cursor
+    def create_state(self, label: str, is_initial: bool = False, is_final: bool = False, output_label: str = None):
+        """Create state and update quintuple, generating the first output symbol when no output is given."""
 
-            # move to the sid indicated by the chosen transaction
-            sid = self.check_state_existance(label=chosen_transaction.arrival_state.label)
+        # inside bulk(), creation waits until the block exits
+        if self.pending_states is not None:
+            self.pending_states.append((label, is_initial, is_final, output_label))
+            return
 
-            # update the list of available transactions of the chosen state
-            available_transactions: List[Transaction] = self.get_transactions(
-                current_sid=sid,
-                current_cursor=cursor,
-                string=string
-            )
+        self.check_state(label, is_initial, is_final, output_label)
+        self.insert_state(label, is_initial, is_final, output_label)
+        self.invalidate()
+
+    def check_state(
+            self, label: str, is_initial: bool = False, is_final: bool = False, output_label: str = None
+    ) -> str:
+        """Raise if a state can't be created, otherwise return its label."""
+
+        super().check_state(label, is_initial, is_final)
+
+        if output_label is None and len(self.output_alphabet) == 0:
+            raise ValueError("Output alphabet has no symbol to generate.")
+        if output_label is not None and output_label not in self.output_alphabet:
+            raise ValueError(f"Output {output_label} does not exist in output alphabet.")
+
+        return label
 
-        if self.states[sid].is_final and cursor >= len(string):
-            return True
-        return False
+    def check_states(self, states: List[Tuple[Union[str, bool], ...]]) -> List[str]:
+        """Raise if a batch of states can't be created, checking their outputs as a column as well."""
+
+        outputs: Set[str] = {state[3] if len(state) > 3 else None for state in states}
+        if None in outputs and len(self.output_alphabet) == 0:
+            raise ValueError("Output alphabet has no symbol to generate.")
+        unknown: Set[str] = outputs - {None} - self.output_alphabet.index.keys()
+        if unknown:
+            raise ValueError(f"Output {sorted(unknown)[0]} does not exist in output alphabet.")
+
+        return super().check_states(states)
+
+    def new_state(self, label: str, is_initial: bool, is_final: bool, output_label: str = None) -> MooreState:
+        """State generating an output, the first of the output alphabet by default."""
+
+        return MooreState(
+            label=label,
+            is_initial=is_initial,
+            is_final=is_final,
+            output=Symbol.intern(label=output_label) if output_label is not None else self.output_alphabet[0]
+        )
+
+    def update_output(self, label: str, output_label: str):
+        """Change the output generated by a state."""
+
+        sid: int = self.check_state_existance(label=label)
+        if sid < 0:
+            raise ValueError(f"State {label} does not exist.")
+        if output_label not in self.output_alphabet:
+            raise ValueError(f"Output {output_label} does not exist in output alphabet.")
+
+        self.states[sid].output = Symbol.intern(label=output_label)
+        self.invalidate()
+
+    def compile_moore(self) -> MooreTable:
+        """Compiled table of the machine, which must be deterministic to generate a single output."""
+
+        table: MooreTable = self.compile()
+        if not table.deterministic:
+            raise ValueError(f"Moore machine {self.label} must be deterministic to generate outputs.")
+
+        return table
+
+    def translate(self, string: Sequence[str]) -> str:
+        """Return the outputs of the states entered while consuming a string."""
+
+        return self.compile_moore().translate(string)
+
+    def translate_bytes(self, string: Sequence[str], encoding: str = "utf-8") -> bytes:
+        """Return the encoded outputs of the states entered while consuming a string."""
+
+        return self.compile_moore().translate_bytes(string, encoding=encoding)
+
+    def translate_codes(self, string: Sequence[str]) -> np.ndarray:
+        """Return the index in the output alphabet of the output of each state entered while consuming a string."""
+
+        return self.compile_moore().translate_codes(string)
 
     def __str__(self):
-        Q: str = ', '.join([str(state) for state in self.states.values()])
+        Q: str = ', '.join([f"{state}/{state.output}" for state in self.states.values()])
         S: str = ', '.join([str(symbol) for symbol in self.alphabet])
         D: str = ', '.join([str(symbol) for symbol in self.output_alphabet])
         d: str = ', '.join([str(transaction) for transaction in self.transactions.values()])
-        l: str = ', '.join([str(transaction) for transaction in self.transactions.values()])
         s0: str = str(self.initial_state)
         F: str = ', '.join([str(state) for state in self.final_states.values()])
 
-        return f"""{self.label} = (\n\t{{{Q}}},\n\t{{{S}}},\n\t{{{d}}},\n\t{s0},\n\t{{{F}}}\n)"""
+        return f"""{self.label} = (\n\t{{{Q}}},\n\t{{{S}}},\n\t{{{D}}},\n\t{{{d}}},\n\t{s0},\n\t{{{F}}}\n)"""
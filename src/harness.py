@@ -0,0 +1,174 @@
+from typing import List, Dict, Tuple, Union, Callable, Iterator, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import chain, islice
+from time import perf_counter
+
+import numpy as np
+
+from src.automata import Automata
+from src.table import TransitionTable, init_worker
+from src.utils import iterate_strings, match_masks
+
+Engine = Callable[[List[str]], Sequence[bool]]
+
+
+class Report:
+    """Outcome of checking an automata against a reference, with the strings where both disagree."""
+
+    def __init__(
+            self, checked: int, elapsed: float, counterexamples: List[Tuple[str, bool, bool]], unit: str = "strings"
+    ):
+        self.checked: int = checked
+        self.elapsed: float = elapsed
+        self.unit: str = unit
+
+        # (string, accepted by the automata, accepted by the reference)
+        self.counterexamples: List[Tuple[str, bool, bool]] = counterexamples
+
+    @property
+    def passed(self) -> bool:
+        """Whether no counterexample was found."""
+
+        return not self.counterexamples
+
+    @property
+    def throughput(self) -> float:
+        """Checked strings (or states) per second."""
+
+        return self.checked / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def __bool__(self):
+        return self.passed
+
+    def __str__(self):
+        lines: List[str] = [
+            f"{'Passed' if self.passed else 'Failed'}: {self.checked} {self.unit} checked in {self.elapsed:.3f}s "
+            f"({self.throughput:,.0f} {self.unit}/s)."
+        ]
+        for string, accepted, expected in self.counterexamples:
+            lines.append(f"  {string!r}: automata {'accepts' if accepted else 'rejects'}, "
+                         f"reference {'accepts' if expected else 'rejects'}")
+
+        return "\n".join(lines)
+
+
+def regex_engine(pattern: str, workers: int = None, chunksize: int = 10000, executor: Executor = None) -> Engine:
+    """
+    Engine that tells if a regex pattern matches each whole string, like Automata.from_regex recognizes them, in the
+    given executor if any, so every batch reuses the same processes.
+    """
+
+    anchored: str = f"(?:{pattern})\\Z"
+
+    return lambda strings: match_masks(
+        pattern=anchored, strings=strings, workers=workers, chunksize=chunksize, executor=executor
+    )
+
+
+def automata_engine(
+        automata: Automata, workers: int = None, chunksize: int = 10000, executor: Executor = None, key: int = 0
+) -> Engine:
+    """
+    Engine that recognizes each string with an automata, in the given executor if any, whose workers hold its table
+    under key, see TransitionTable.accepts_many.
+    """
+
+    return lambda strings: automata.recognize_many(
+        strings=strings, workers=workers, chunksize=chunksize, executor=executor, key=key
+    )
+
+
+def differential(
+        candidate: Engine, reference: Engine, alphabet: Sequence[str], size: int, batch_size: int = 100000,
+        limit: int = 10
+) -> Report:
+    """
+    Run two engines on every string of an alphabet up until a given size, including the empty string, in batches of
+    batch_size strings, keeping the first limit strings where their answers differ.
+    """
+
+    strings: Iterator[str] = chain([""], iterate_strings(alphabet=alphabet, size=size))
+    counterexamples: List[Tuple[str, bool, bool]] = []
+    checked: int = 0
+
+    start: float = perf_counter()
+    while True:
+        batch: List[str] = list(islice(strings, batch_size))
+        if not batch:
+            break
+
+        accepted: np.ndarray = np.asarray(candidate(batch), dtype=bool)
+        expected: np.ndarray = np.asarray(reference(batch), dtype=bool)
+
+        for i in np.flatnonzero(accepted != expected)[:limit - len(counterexamples)]:
+            counterexamples.append((batch[i], bool(accepted[i]), bool(expected[i])))
+
+        checked += len(batch)
+    elapsed: float = perf_counter() - start
+
+    return Report(checked=checked, elapsed=elapsed, counterexamples=counterexamples)
+
+
+def compare(
+        automata: Automata, reference: Union[Automata, str], size: int, workers: int = None, chunksize: int = 10000,
+        batch_size: int = 100000, limit: int = 10
+) -> Report:
+    """
+    Check exhaustively that an automata agrees with another automata or with a regex pattern on every string up until
+    a given size, in parallel with workers > 1, in a single pool of processes that receives the tables once.
+    """
+
+    with ExitStack() as stack:
+        executor: Executor = None
+        if workers and workers > 1:
+            tables: Dict[int, Union[TransitionTable, str]] = {0: automata.compile_acceptor().shipped}
+            if not isinstance(reference, str):
+                tables[1] = reference.compile_acceptor().shipped
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(tables,))
+            )
+
+        if isinstance(reference, str):
+            expected: Engine = regex_engine(pattern=reference, chunksize=chunksize, executor=executor)
+        else:
+            expected = automata_engine(automata=reference, chunksize=chunksize, executor=executor, key=1)
+
+        return differential(
+            candidate=automata_engine(automata=automata, chunksize=chunksize, executor=executor, key=0),
+            reference=expected,
+            alphabet=[str(symbol) for symbol in automata.alphabet],
+            size=size,
+            batch_size=batch_size,
+            limit=limit
+        )
+
+
+def equivalent(automata: Automata, reference: Union[Automata, str]) -> Report:
+    """
+    Decide if an automata accepts exactly the same strings as another automata or a regex pattern, by searching the
+    product of both deterministic tables for a state where only one of them accepts. The counterexample, if any, is
+    one of the shortest strings where they differ.
+
+    This only compares automata: a pattern is compiled by Automata.from_regex, so it is not an independent oracle, and
+    the answer of python re is only checked on the counterexample, which is reported with it. Use compare() to check
+    Automata.from_regex itself against re.
+    """
+
+    pattern: str = reference if isinstance(reference, str) else None
+    if pattern is not None:
+        reference = Automata.from_regex(pattern=pattern, alphabet=automata.alphabet)
+
+    start: float = perf_counter()
+    left: TransitionTable = automata.compile_deterministic()
+    right: TransitionTable = reference.compile_deterministic()
+    difference: TransitionTable = left.product(other=right, combine=lambda a, b: a != b)
+    word: str = difference.shortest_word()
+    elapsed: float = perf_counter() - start
+
+    counterexamples: List[Tuple[str, bool, bool]] = []
+    if word is not None:
+        expected: bool = right.accepts(word) if pattern is None else bool(regex_engine(pattern=pattern)([word])[0])
+        counterexamples.append((word, left.accepts(word), expected))
+
+    return Report(checked=len(difference), elapsed=elapsed, counterexamples=counterexamples, unit="states")
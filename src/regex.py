@@ -0,0 +1,300 @@
+from typing import List, Dict, Tuple, Set, Union
+import re
+
+from src.table import TransitionTable
+
+
+CLASS_ESCAPES: str = "dDwWsS"  # escapes that match, as in python re, any symbol of the alphabet in a class
+CONTROL_ESCAPES: Dict[str, str] = {"a": "\a", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v"}
+
+
+class ThompsonBuilder:
+    """
+    Recursive descent parser of a regular expression that builds an automata with empty transitions by Thompson
+    construction. It supports literals, escaped metacharacters, the \\d \\w \\s classes and their negations, control
+    escapes like \\n, ., [...] classes, groups, |, *, + and ?. Automata recognize whole strings, so like in
+    re.fullmatch, ^ and $ only match at the start and at the end of the string, and a$b matches nothing.
+    """
+
+    def __init__(self, pattern: str, symbols: List[str]):
+        self.pattern: str = pattern
+        self.position: int = 0
+
+        self.symbols: List[str] = symbols
+        self.symbol_index: Dict[str, int] = {symbol: code for code, symbol in enumerate(symbols)}
+
+        # state -> arrivals by empty transitions, state -> (symbol code, arrival), and state -> (anchor, arrival) of the
+        # empty transitions only followed at the start (^) or at the end ($) of the string
+        self.empty: List[List[int]] = []
+        self.moves: List[List[Tuple[int, int]]] = []
+        self.anchors: List[List[Tuple[str, int]]] = []
+
+    def new_state(self) -> int:
+        """Add a state without transitions."""
+
+        self.empty.append([])
+        self.moves.append([])
+        self.anchors.append([])
+        return len(self.empty) - 1
+
+    def peek(self) -> str:
+        """Next character of the pattern, or None at its end."""
+
+        return self.pattern[self.position] if self.position < len(self.pattern) else None
+
+    def take(self) -> str:
+        """Consume the next character of the pattern."""
+
+        char: str = self.pattern[self.position]
+        self.position += 1
+        return char
+
+    def expect(self, char: str):
+        """Consume a given character, raising if the pattern has another one."""
+
+        if self.peek() != char:
+            raise ValueError(f"Expected {char} at position {self.position} of pattern {self.pattern}.")
+        self.position += 1
+
+    def code(self, char: str) -> int:
+        """Code of a literal of the pattern in the alphabet."""
+
+        if char not in self.symbol_index:
+            raise ValueError(f"Symbol {char} of pattern {self.pattern} does not exist in alphabet.")
+        return self.symbol_index[char]
+
+    def fragment(self, codes: List[int]) -> Tuple[int, int]:
+        """Fragment (start, accept) that consumes any of the given symbols, or nothing if there are none."""
+
+        start: int = self.new_state()
+        accept: int = self.new_state()
+
+        if codes:
+            for code in codes:
+                self.moves[start].append((code, accept))
+        else:
+            self.empty[start].append(accept)
+
+        return start, accept
+
+    def class_fragment(self, codes: List[int]) -> Tuple[int, int]:
+        """Fragment that consumes any of the given symbols, and never matches if there are none."""
+
+        if not codes:
+            return self.new_state(), self.new_state()
+        return self.fragment(codes=codes)
+
+    def parse(self) -> Tuple[int, int]:
+        """Build the whole pattern, returning its (start, accept) states."""
+
+        start, accept = self.alternation()
+
+        if self.position < len(self.pattern):
+            raise ValueError(f"Unexpected {self.peek()} at position {self.position} of pattern {self.pattern}.")
+
+        return start, accept
+
+    def alternation(self) -> Tuple[int, int]:
+        """Branches separated by |, joined by empty transitions."""
+
+        branches: List[Tuple[int, int]] = [self.concatenation()]
+        while self.peek() == "|":
+            self.take()
+            branches.append(self.concatenation())
+
+        if len(branches) == 1:
+            return branches[0]
+
+        start: int = self.new_state()
+        accept: int = self.new_state()
+        for branch_start, branch_accept in branches:
+            self.empty[start].append(branch_start)
+            self.empty[branch_accept].append(accept)
+
+        return start, accept
+
+    def concatenation(self) -> Tuple[int, int]:
+        """Sequence of repetitions, chained by empty transitions."""
+
+        pieces: List[Tuple[int, int]] = []
+        while self.peek() is not None and self.peek() not in "|)":
+            pieces.append(self.repetition())
+
+        if not pieces:
+            return self.fragment(codes=[])
+
+        for (_, previous_accept), (next_start, _) in zip(pieces, pieces[1:]):
+            self.empty[previous_accept].append(next_start)
+
+        return pieces[0][0], pieces[-1][1]
+
+    def repetition(self) -> Tuple[int, int]:
+        """Atom followed by an optional *, + or ? operator."""
+
+        inner_start, inner_accept = self.atom()
+
+        if self.peek() is not None and self.peek() in "*+?":
+            operator: str = self.take()
+
+            # lazy operators like *? accept the same strings
+            if self.peek() == "?":
+                self.take()
+
+            # python re rejects a** as well, and a*+ is a possessive operator, which is not supported
+            if self.peek() is not None and self.peek() in "*+?{":
+                raise ValueError(f"Multiple repeat at position {self.position} of pattern {self.pattern}.")
+
+            start: int = self.new_state()
+            accept: int = self.new_state()
+            self.empty[start].append(inner_start)
+            self.empty[inner_accept].append(accept)
+
+            if operator in "*?":
+                self.empty[start].append(accept)  # skip the inner fragment
+            if operator in "*+":
+                self.empty[inner_accept].append(inner_start)  # repeat the inner fragment
+
+            inner_start, inner_accept = start, accept
+
+        return inner_start, inner_accept
+
+    def atom(self) -> Tuple[int, int]:
+        """Group, character class, wildcard, anchor or literal."""
+
+        char: str = self.take()
+
+        if char == "(":
+            # non-capturing groups behave like groups
+            if self.pattern.startswith("?:", self.position):
+                self.position += 2
+            fragment: Tuple[int, int] = self.alternation()
+            self.expect(")")
+            return fragment
+
+        if char in "^$":
+            start: int = self.new_state()
+            accept: int = self.new_state()
+            self.anchors[start].append((char, accept))
+            return start, accept
+
+        if char == ".":
+            return self.fragment(codes=list(range(len(self.symbols))))
+
+        if char == "[":
+            return self.class_fragment(codes=self.character_class())
+
+        if char == "\\":
+            escaped: Union[str, Set[str]] = self.escape()
+            if isinstance(escaped, str):
+                return self.fragment(codes=[self.code(escaped)])
+            return self.class_fragment(codes=[code for code, symbol in enumerate(self.symbols) if symbol in escaped])
+
+        if char in "*+?{":
+            raise ValueError(f"Unexpected {char} at position {self.position - 1} of pattern {self.pattern}.")
+
+        return self.fragment(codes=[self.code(char)])
+
+    def character_class(self) -> List[int]:
+        """Codes of the symbols matched by a [...] class, whose opening bracket was already consumed."""
+
+        negated: bool = self.peek() == "^"
+        if negated:
+            self.take()
+
+        chars: Set[str] = set()
+        first: bool = True
+        while self.peek() != "]" or first:
+            if self.peek() is None:
+                raise ValueError(f"Pattern {self.pattern} has an unterminated character class.")
+
+            char: Union[str, Set[str]] = self.take()
+            if char == "\\":
+                char = self.escape()
+
+            # ranges like a-z, where a trailing - is a literal
+            if self.peek() == "-" and self.pattern[self.position + 1:self.position + 2] not in ("]", ""):
+                self.take()
+                last: Union[str, Set[str]] = self.take()
+                if last == "\\":
+                    last = self.escape()
+                if isinstance(char, set) or isinstance(last, set):
+                    raise ValueError(f"Bad range before position {self.position} of pattern {self.pattern}.")
+                chars.update(chr(point) for point in range(ord(char), ord(last) + 1))
+            elif isinstance(char, set):
+                chars.update(char)
+            else:
+                chars.add(char)
+            first = False
+        self.expect("]")
+
+        # characters outside the alphabet can never be consumed, so they are left out of the class
+        return [code for code, symbol in enumerate(self.symbols) if (symbol in chars) != negated]
+
+    def escape(self) -> Union[str, Set[str]]:
+        """
+        Character of an escape whose backslash was already consumed, or the set of symbols of the alphabet matched by
+        a class escape. Escapes of other letters and digits, like \\b or \\1, are rejected instead of read as literals.
+        """
+
+        if self.peek() is None:
+            raise ValueError(f"Pattern {self.pattern} ends with an incomplete escape.")
+        char: str = self.take()
+
+        if char in CLASS_ESCAPES:
+            return {symbol for symbol in self.symbols if re.fullmatch(f"\\{char}", symbol)}
+        if char in CONTROL_ESCAPES:
+            return CONTROL_ESCAPES[char]
+        if char.isascii() and char.isalnum():
+            raise ValueError(f"Unsupported escape \\{char} at position {self.position - 2} of pattern {self.pattern}.")
+
+        return char
+
+    def closure(self, state: int, anchors: str = "") -> Set[int]:
+        """States reachable from a state using only empty transitions, and the transitions of the given anchors."""
+
+        closure: Set[int] = {state}
+        stack: List[int] = [state]
+        while stack:
+            current: int = stack.pop()
+            arrivals: List[int] = self.empty[current] + [
+                arrival for anchor, arrival in self.anchors[current] if anchor in anchors
+            ]
+            for arrival in arrivals:
+                if arrival not in closure:
+                    closure.add(arrival)
+                    stack.append(arrival)
+
+        return closure
+
+    def build(self) -> TransitionTable:
+        """
+        Parse the pattern and remove empty transitions, keeping only states reachable from the start. ^ is only
+        followed from the start, before any symbol, and $ only when checking if a state accepts.
+        """
+
+        start, accept = self.parse()
+
+        closures: List[Set[int]] = [self.closure(state) for state in range(len(self.empty))]
+
+        # a state moves by a symbol wherever any state of its closure does, and accepts if its closure does
+        renumber: Dict[int, int] = {}
+        members: List[Set[int]] = [self.closure(start, anchors="^")]
+        final: List[bool] = [accept in self.closure(start, anchors="^$")]
+        edges: Set[Tuple[int, int, int]] = set()
+
+        for state, closure in enumerate(members):
+            for member in closure:
+                for code, arrival in self.moves[member]:
+                    if arrival not in renumber:
+                        renumber[arrival] = len(members)
+                        members.append(closures[arrival])
+                        final.append(accept in self.closure(arrival, anchors="$"))
+                    edges.add((state, code, renumber[arrival]))
+
+        return TransitionTable(
+            labels=[f"q{i}" for i in range(len(members))],
+            symbols=self.symbols,
+            initial=0,
+            final=final,
+            edges=sorted(edges)
+        )
@@ -1,9 +1,13 @@
+from src.symbol import Symbol
+
 
 class State:
     """
     Labeled element responsible for recording information gathered in the past, but also relevant for future decisions.
     """
 
+    __slots__ = ("label", "is_initial", "is_final")
+
     def __init__(self, label: str, is_initial: bool = False, is_final: bool = False):
         self.label: str = label
         self.is_initial: bool = is_initial
@@ -17,9 +21,16 @@ class State:
             return NotImplemented
         return self.label == other.label
 
+    def __hash__(self):
+        # states are identified by their label, which must not change while used as a key
+        return hash(self.label)
+
 
 class MooreState(State):
+    """State that generates an output symbol each time it is entered."""
 
-    def __init__(self, label: str, is_initial: bool = False, is_final: bool = False):
+    __slots__ = ("output",)
+
+    def __init__(self, label: str, is_initial: bool = False, is_final: bool = False, output: Symbol = None):
         super().__init__(label=label, is_initial=is_initial, is_final=is_final)
-        pass
+        self.output: Symbol = output
@@ -1,7 +1,24 @@
+from typing import Dict
+
+
 class Symbol:
+    __slots__ = ("label",)
+
+    # one shared instance per label, see intern()
+    interned: Dict[str, "Symbol"] = {}
+
     def __init__(self, label: str):
         self.label: str = label
 
+    @classmethod
+    def intern(cls, label: str) -> "Symbol":
+        """Return the shared symbol of a label, so alphabets and transactions don't hold one copy per edge."""
+
+        symbol: Symbol = cls.interned.get(label)
+        if symbol is None:
+            symbol = cls.interned[label] = cls(label=label)
+        return symbol
+
     def __eq__(self, other):
         if not isinstance(other, Symbol):
             if isinstance(other, str):
@@ -9,6 +26,10 @@ class Symbol:
             return NotImplemented
         return self.label == other.label
 
+    def __hash__(self):
+        # equal to the hash of its label, since symbols compare equal to their label
+        return hash(self.label)
+
     def __str__(self):
         return self.label
 
@@ -0,0 +1,1387 @@
+from typing import List, Dict, Tuple, Set, FrozenSet, Sequence, Iterable, Iterator, Callable, Optional, Union
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from array import array
+from collections import OrderedDict
+import struct
+
+import numpy as np
+
+from src.alphabet import Alphabet, UNKNOWN
+
+
+DEAD: int = UNKNOWN  # index used when there is no transition to follow, equal to the code of unknown symbols
+
+# binary layout written by TransitionTable.save: a header, then sections that each start at a multiple of 8 bytes
+MAGIC: bytes = b"PFLP"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<4sHBBiIIIII")  # magic, version, kind, flags, initial, counts, names size
+TABLE_KIND: int = 0
+MEALY_KIND: int = 1
+MOORE_KIND: int = 2
+DETERMINISTIC_FLAG: int = 1
+LIVE_FLAG: int = 2  # the live mask and the padded table follow the dense tables
+
+worker_tables: Dict[int, "TransitionTable"] = {}  # key -> table received by each worker process of accepts_many
+
+
+def init_worker(tables: Dict[int, Union["TransitionTable", str]]):
+    """
+    Keep the tables shipped to a worker process by key, so they are sent once instead of once per chunk. A path is
+    given instead for tables loaded from a file, which each worker memory-maps again, sharing the same pages.
+    """
+
+    global worker_tables
+    worker_tables = {
+        key: TransitionTable.load(path=table) if isinstance(table, str) else table for key, table in tables.items()
+    }
+
+
+def aligned(size: int) -> int:
+    """Size rounded up to the next multiple of 8 bytes."""
+
+    return size + -size % 8
+
+
+def common_prefix(first: Sequence[str], second: Sequence[str]) -> int:
+    """Length of the longest common prefix of two strings, by binary search over slices compared in C."""
+
+    low: int = 0
+    high: int = min(len(first), len(second))
+    if first[:high] == second[:high]:
+        return high
+
+    while low < high:
+        middle: int = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+def accepts_chunk(strings: List[Sequence[str]], key: int = 0) -> List[bool]:
+    """Run a table of the current worker process over a chunk of strings."""
+
+    table: TransitionTable = worker_tables[key]
+
+    return [table.accepts(string) for string in strings]
+
+
+class TransitionTable:
+    """Integer-indexed view of an automata, where states and symbols are mapped to consecutive ints."""
+
+    def __init__(
+            self, labels: List[str], symbols: List[str], initial: int, final: Sequence[bool],
+            edges: Sequence[Tuple[int, int, int]], table: np.ndarray = None, deterministic: bool = None
+    ):
+        self.labels: List[str] = labels
+        self.symbols: List[str] = symbols
+        self.alphabet: Alphabet = Alphabet(symbol_labels=symbols)
+        self.symbol_index: Dict[str, int] = self.alphabet.index
+        self.initial: int = initial
+        self.final: np.ndarray = np.asarray(final, dtype=bool).reshape(len(labels))
+        self.edges: Sequence[Tuple[int, int, int]] = edges  # (departure, symbol, arrival)
+
+        self.index_cache: Dict[str, int] = None  # built on demand by index
+        self.edge_array_cache: np.ndarray = None  # built on demand by edge_array
+        self.edge_list_cache: List[List[int]] = None  # built on demand by edge_list
+
+        # deterministic when no pair of state and symbol has more than one transition, unless already known, for
+        # instance read by load() from the header, so the edges of a mapped file are not read
+        self.deterministic: bool = deterministic
+        if self.deterministic is None:
+            keys: np.ndarray = self.edge_array[:, 0] * len(symbols) + self.edge_array[:, 1]
+            self.deterministic = len(np.unique(keys)) == len(keys)
+
+        # dense table[state, symbol] -> next state, only meaningful for deterministic machines, and given when it was
+        # already built, for instance memory-mapped by load()
+        self.table: np.ndarray = table
+        if self.table is None and self.deterministic:
+            edge_array: np.ndarray = self.edge_array
+            self.table = np.full((len(labels), len(symbols)), DEAD, dtype=np.int32)
+            self.table[edge_array[:, 0], edge_array[:, 1]] = edge_array[:, 2]
+
+        self.source: str = None  # file memory-mapped by load(), so workers can map it instead of receiving a copy
+
+        self.successors_cache: List[List[Tuple[int, ...]]] = None  # built on demand by successors
+        self.predecessors_cache: List[List[Tuple[int, ...]]] = None  # built on demand by predecessors
+        self.rows_cache: List[List[int]] = None  # built on demand by rows
+        self.live_cache: np.ndarray = None  # built on demand by live
+        self.live_successors_cache: List[List[Tuple[int, ...]]] = None  # built on demand by live_successors
+        self.live_rows_cache: List[List[int]] = None  # built on demand by live_rows
+        self.padded_cache: np.ndarray = None  # built on demand by padded
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """State label -> state."""
+
+        if self.index_cache is None:
+            self.index_cache = {label: state for state, label in enumerate(self.labels)}
+        return self.index_cache
+
+    @property
+    def edge_array(self) -> np.ndarray:
+        """Edges as an integer matrix with one (departure, symbol, arrival) row per edge, without copying arrays."""
+
+        if self.edge_array_cache is None:
+            edges: np.ndarray = self.edges
+            if not isinstance(edges, np.ndarray):
+                edges = np.asarray(edges, dtype=np.int64)
+            self.edge_array_cache = edges.reshape(-1, 3)
+        return self.edge_array_cache
+
+    @property
+    def edge_list(self) -> Sequence[Sequence[int]]:
+        """Edges as python ints, converted once from arrays, since looping over numpy scalars is much slower."""
+
+        if not isinstance(self.edges, np.ndarray):
+            return self.edges
+        if self.edge_list_cache is None:
+            self.edge_list_cache = self.edges.tolist()
+        return self.edge_list_cache
+
+    @property
+    def successors(self) -> List[List[Tuple[int, ...]]]:
+        """successors[state][symbol] holds every state reachable by consuming symbol from state."""
+
+        if self.successors_cache is None:
+            self.successors_cache = [[() for _ in self.symbols] for _ in self.labels]
+            for departure, symbol, arrival in self.edge_list:
+                self.successors_cache[departure][symbol] += (arrival,)
+        return self.successors_cache
+
+    @property
+    def predecessors(self) -> List[List[Tuple[int, ...]]]:
+        """predecessors[state][symbol] holds every state that reaches state by consuming symbol."""
+
+        if self.predecessors_cache is None:
+            self.predecessors_cache = [[() for _ in self.symbols] for _ in self.labels]
+            for departure, symbol, arrival in self.edge_list:
+                self.predecessors_cache[arrival][symbol] += (departure,)
+        return self.predecessors_cache
+
+    @property
+    def rows(self) -> List[List[int]]:
+        """Dense table as plain lists, which are faster than numpy for scalar indexing."""
+
+        if self.rows_cache is None and self.table is not None:
+            self.rows_cache = self.table.tolist()
+        return self.rows_cache
+
+    @property
+    def live(self) -> np.ndarray:
+        """
+        Mask of the states from which some final state can be reached, found by a backward search from them that
+        expands the whole frontier at once, over the departures of the edges grouped by arrival.
+        """
+
+        if self.live_cache is None:
+            edges: np.ndarray = self.edge_array
+            departures: np.ndarray = edges[np.argsort(edges[:, 2], kind="stable"), 0]
+            offsets: np.ndarray = np.zeros(len(self.labels) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(edges[:, 2], minlength=len(self.labels)), out=offsets[1:])
+
+            live: np.ndarray = self.final.copy()
+            frontier: np.ndarray = np.flatnonzero(live)
+            while frontier.size:
+                # positions of the departures of every frontier state, as concatenated ranges
+                starts: np.ndarray = offsets[frontier]
+                counts: np.ndarray = offsets[frontier + 1] - starts
+                ends: np.ndarray = np.cumsum(counts)
+                positions: np.ndarray = np.repeat(starts - ends + counts, counts) + np.arange(ends[-1])
+
+                reached: np.ndarray = departures[positions]
+                frontier = np.unique(reached[~live[reached]])
+                live[frontier] = True
+            self.live_cache = live
+        return self.live_cache
+
+    @property
+    def live_initial(self) -> int:
+        """Initial state, or DEAD when no string can be accepted from it."""
+
+        return self.initial if self.initial != DEAD and self.live[self.initial] else DEAD
+
+    @property
+    def live_successors(self) -> List[List[Tuple[int, ...]]]:
+        """Successors that can still reach a final state, so runs drop the others as soon as they enter them."""
+
+        if self.live_successors_cache is None:
+            live: List[bool] = self.live.tolist()
+            self.live_successors_cache = [
+                [tuple(arrival for arrival in arrivals if live[arrival]) for arrivals in row] for row in self.successors
+            ]
+        return self.live_successors_cache
+
+    @property
+    def live_rows(self) -> List[List[int]]:
+        """Dense table as plain lists, where transitions into states that can't reach a final state go to DEAD."""
+
+        if self.live_rows_cache is None and self.table is not None:
+            self.live_rows_cache = self.padded[:-1, :-1].tolist()
+        return self.live_rows_cache
+
+    @property
+    def padded(self) -> np.ndarray:
+        """
+        Dense table with an extra dead row and an extra column for unknown symbols, both filled with DEAD, where
+        transitions into states that can't reach a final state go to DEAD as well. Since DEAD is -1, indexing with a
+        DEAD state or an unknown code lands on them, so whole vectors are advanced without checks.
+        """
+
+        if self.padded_cache is None and self.table is not None:
+            # a DEAD arrival reads the appended False, so it stays DEAD
+            alive: np.ndarray = np.append(self.live, False)[self.table]
+            self.padded_cache = np.full((len(self.labels) + 1, len(self.symbols) + 1), DEAD, dtype=np.int32)
+            self.padded_cache[:-1, :-1] = np.where(alive, self.table, DEAD)
+        return self.padded_cache
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getstate__(self) -> Dict[str, object]:
+        """
+        Compact state pickled for worker processes: lazy caches are left empty, the alphabet is rebuilt from the
+        symbols, and deterministic tables drop their edges, which are read back from the dense table.
+        """
+
+        state: Dict[str, object] = {
+            name: None if name.endswith("_cache") else value for name, value in self.__dict__.items()
+            if name not in ("alphabet", "symbol_index")
+        }
+        if self.deterministic:
+            state["edges"] = None
+
+        return state
+
+    def __setstate__(self, state: Dict[str, object]):
+        self.__dict__.update(state)
+        self.alphabet = Alphabet(symbol_labels=self.symbols)
+        self.symbol_index = self.alphabet.index
+
+        if self.edges is None:
+            departures, codes = np.nonzero(np.asarray(self.table) != DEAD)
+            self.edges = np.column_stack((departures, codes, self.table[departures, codes])).astype(np.int32)
+
+    def encode(self, string: Sequence[str]) -> List[int]:
+        """Translate a string into symbol codes, where symbols outside the alphabet become DEAD."""
+
+        return self.alphabet.encode(string).tolist()
+
+    def accepts(self, string: Sequence[str]) -> bool:
+        """Run the table over a string and tell whether it ends in a final state."""
+
+        if self.deterministic:
+            return self.accepts_deterministic(string)
+        return self.accepts_nondeterministic(string)
+
+    def accepts_deterministic(self, string: Sequence[str]) -> bool:
+        """Run a deterministic table over a string, doing constant work per symbol."""
+
+        if not self.deterministic:
+            raise ValueError("Only deterministic tables can be run symbol by symbol.")
+
+        # runs stop as soon as they enter a state that can't reach a final one
+        state: int = self.live_initial
+        if state == DEAD:
+            return False
+
+        symbol_index: Dict[str, int] = self.symbol_index
+
+        # tables mapped from a file run on the mapped padded table, so processes share its pages instead of building
+        # private lists, unknown symbols and DEAD landing on its extra column and row
+        if self.source is not None:
+            padded: np.ndarray = self.padded
+            for symbol in string:
+                state = padded[state, symbol_index.get(symbol, DEAD)]
+                if state == DEAD:
+                    return False
+            return bool(self.final[state])
+
+        rows: List[List[int]] = self.live_rows
+
+        for symbol in string:
+            code: int = symbol_index.get(symbol, DEAD)
+            if code == DEAD:
+                return False
+            state = rows[state][code]
+            if state == DEAD:
+                return False
+
+        return bool(self.final[state])
+
+    def accepts_codes(self, codes: Sequence[int]) -> bool:
+        """Run the table over a string already encoded as symbol codes, simulating sets if it is nondeterministic."""
+
+        if not self.deterministic:
+            return self.accepts_nondeterministic([self.symbols[code] if code != DEAD else None for code in codes])
+
+        state: int = self.live_initial
+        if state == DEAD:
+            return False
+
+        rows: List[List[int]] = self.live_rows
+
+        for code in np.asarray(codes).tolist():
+            if code == DEAD:
+                return False
+            state = rows[state][code]
+            if state == DEAD:
+                return False
+
+        return bool(self.final[state])
+
+    def accepts_nondeterministic(self, string: Sequence[str]) -> bool:
+        """Advance the whole set of active states at once, so every path is followed in a single pass."""
+
+        if self.live_initial == DEAD:
+            return False
+
+        states: FrozenSet[int] = frozenset((self.initial,))
+        successors: List[List[Tuple[int, ...]]] = self.live_successors
+        symbol_index: Dict[str, int] = self.symbol_index
+
+        for symbol in string:
+            code: int = symbol_index.get(symbol, DEAD)
+            if code == DEAD:
+                return False
+            states = frozenset(arrival for state in states for arrival in successors[state][code])
+            if not states:
+                return False
+
+        return bool(any(self.final[state] for state in states))
+
+    def start(self) -> FrozenSet[int]:
+        """Set of active states before any symbol is consumed."""
+
+        return frozenset() if self.live_initial == DEAD else frozenset((self.initial,))
+
+    def advance(self, states: FrozenSet[int], string: Sequence[str]) -> FrozenSet[int]:
+        """Consume a string from a set of active states, returning the set of states reached."""
+
+        symbol_index: Dict[str, int] = self.symbol_index
+
+        if self.deterministic:
+            if not states:
+                return states
+
+            state: int = next(iter(states))
+            rows: List[List[int]] = self.live_rows
+            for symbol in string:
+                code: int = symbol_index.get(symbol, DEAD)
+                if code == DEAD:
+                    return frozenset()
+                state = rows[state][code]
+                if state == DEAD:
+                    return frozenset()
+
+            return frozenset((state,))
+
+        successors: List[List[Tuple[int, ...]]] = self.live_successors
+        for symbol in string:
+            code: int = symbol_index.get(symbol, DEAD)
+            if code == DEAD or not states:
+                return frozenset()
+            states = frozenset(arrival for state in states for arrival in successors[state][code])
+
+        return states
+
+    def accepting(self, states: FrozenSet[int]) -> bool:
+        """Tell whether a set of active states contains a final state."""
+
+        return bool(any(self.final[state] for state in states))
+
+    def accepts_batch(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Run a deterministic table over many strings of the same length at once, given as a matrix of symbol codes with
+        one string per row, advancing the states of every string together one column at a time.
+        """
+
+        if not self.deterministic:
+            raise ValueError("Only deterministic tables can be run symbol by symbol.")
+
+        codes = np.asarray(codes, dtype=np.int32)
+        if codes.ndim != 2:
+            raise ValueError(f"Codes must be a matrix with one string per row, not an array of shape {codes.shape}.")
+        if codes.size and (codes.min() < DEAD or codes.max() >= len(self.symbols)):
+            raise ValueError("Codes must be indexes of symbols in the alphabet, or DEAD for unknown symbols.")
+
+        padded: np.ndarray = self.padded
+        states: np.ndarray = np.full(len(codes), self.live_initial, dtype=np.int32)
+        for column in codes.T:
+            states = padded[states, column]
+
+        # a DEAD state reads the appended False
+        return np.append(self.final, False)[states]
+
+    def accepts_sorted(self, strings: Iterable[Sequence[str]]) -> np.ndarray:
+        """
+        Run a deterministic table over many strings walked in sorted order, so the states reached by the prefix a
+        string shares with the previous one are reused, and each distinct prefix is consumed once. Results follow the
+        input order.
+        """
+
+        if not self.deterministic:
+            raise ValueError("Only deterministic tables can be run symbol by symbol.")
+
+        strings = list(strings)
+        if self.live_initial == DEAD:
+            return np.zeros(len(strings), dtype=bool)
+
+        rows: List[List[int]] = self.live_rows
+        final: List[bool] = self.final.tolist()
+        symbol_index: Dict[str, int] = self.symbol_index
+        results: List[bool] = [False] * len(strings)
+
+        # path[i] is the state reached after the first i symbols of the previous string, until it died
+        path: List[int] = [self.initial]
+        previous: Sequence[str] = ""
+        died: bool = False
+
+        for i in sorted(range(len(strings)), key=strings.__getitem__):
+            string: Sequence[str] = strings[i]
+            shared: int = common_prefix(previous, string)
+            previous = string
+
+            # sharing the symbol that killed the previous string dies the same way
+            if died and shared >= len(path):
+                continue
+            if shared < len(path) - 1:
+                del path[shared + 1:]
+
+            state: int = path[-1]
+            for symbol in string[len(path) - 1:]:
+                code: int = symbol_index.get(symbol, DEAD)
+                if code == DEAD:
+                    break
+                state = rows[state][code]
+                if state == DEAD:
+                    break
+                path.append(state)
+
+            died = len(path) <= len(string)
+            results[i] = not died and final[state]
+
+        return np.array(results, dtype=bool)
+
+    @property
+    def shipped(self) -> Union["TransitionTable", str]:
+        """What init_worker receives: tables loaded from a file are shipped as their path, so workers map the file."""
+
+        return self.source or self
+
+    def accepts_many(
+            self, strings: Iterable[Sequence[str]], workers: int = None, chunksize: int = 10000,
+            executor: Executor = None, key: int = 0
+    ) -> np.ndarray:
+        """
+        Run the table over many strings, splitting them in chunks across worker processes when requested. A running
+        executor is reused instead of starting one, whose workers were initialized by init_worker with this table
+        under key.
+        """
+
+        strings = list(strings)
+
+        if executor is None and (not workers or workers <= 1):
+            return np.fromiter((self.accepts(string) for string in strings), dtype=bool, count=len(strings))
+
+        chunks: List[List[Sequence[str]]] = [strings[i:i + chunksize] for i in range(0, len(strings), chunksize)]
+
+        if executor is not None:
+            results: List[List[bool]] = list(executor.map(accepts_chunk, chunks, repeat(key)))
+        else:
+            with ProcessPoolExecutor(
+                    max_workers=workers, initializer=init_worker, initargs=({key: self.shipped},)
+            ) as executor:
+                results = list(executor.map(accepts_chunk, chunks, repeat(key)))
+
+        return np.fromiter((result for chunk in results for result in chunk), dtype=bool, count=len(strings))
+
+    def save(self, path: str):
+        """
+        Write the table to a file: a header, the state and symbol labels, a bitmap of final states, the int32 edges,
+        the output of each edge for Mealy tables or of each state for Moore tables, and the dense int32 tables of
+        deterministic ones, followed by their live mask and padded table, so loading them computes nothing.
+        """
+
+        mealy: bool = isinstance(self, MealyTable)
+        moore: bool = isinstance(self, MooreTable)
+        output_symbols: List[str] = self.output_symbols if mealy or moore else []
+        names: bytes = "\0".join(list(self.labels) + list(self.symbols) + list(output_symbols)).encode("utf-8")
+
+        sections: List[bytes] = [
+            names,
+            np.packbits(self.final, bitorder="little").tobytes(),
+            np.asarray(self.edges, dtype="<i4").reshape(-1, 3).tobytes()
+        ]
+        if mealy:
+            sections.append(np.asarray(self.outputs, dtype="<i4").tobytes())
+        if moore:
+            sections.append(np.asarray(self.state_outputs, dtype="<i4").tobytes())
+        if self.deterministic:
+            sections.append(np.asarray(self.table, dtype="<i4").tobytes())
+            if mealy:
+                sections.append(np.asarray(self.output_table, dtype="<i4").tobytes())
+            sections.append(np.packbits(self.live, bitorder="little").tobytes())
+            sections.append(np.asarray(self.padded, dtype="<i4").tobytes())
+
+        kind: int = MEALY_KIND if mealy else MOORE_KIND if moore else TABLE_KIND
+        header: bytes = HEADER.pack(
+            MAGIC, VERSION, kind, DETERMINISTIC_FLAG | LIVE_FLAG if self.deterministic else 0,
+            self.initial, len(self.labels), len(self.symbols), len(output_symbols), len(self.edges), len(names)
+        )
+
+        with open(path, "wb") as file:
+            file.write(header)
+            for section in sections:
+                file.write(section)
+                file.write(bytes(aligned(len(section)) - len(section)))
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "TransitionTable":
+        """
+        Read a table written by save(). With mmap, the edges and dense tables are memory-mapped instead of copied, so
+        processes that load the same file share its pages.
+        """
+
+        with open(path, "rb") as file:
+            header: bytes = file.read(HEADER.size)
+            if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+                raise ValueError(f"File {path} does not contain a transition table.")
+
+            _, version, kind, flags, initial, n_states, n_symbols, n_outputs, n_edges, names_size = (
+                HEADER.unpack(header)
+            )
+            if version != VERSION:
+                raise ValueError(f"File {path} has version {version}, only version {VERSION} is supported.")
+
+            names: List[str] = file.read(names_size).decode("utf-8").split("\0")
+            if n_states + n_symbols + n_outputs == 0:
+                names = []
+
+        offset: int = HEADER.size + aligned(names_size)
+
+        def section(dtype: str, shape: Tuple[int, ...]) -> np.ndarray:
+            nonlocal offset
+            count: int = int(np.prod(shape))
+            if mmap and count:
+                data: np.ndarray = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+            else:
+                data = np.fromfile(path, dtype=dtype, count=count, offset=offset).reshape(shape)
+            offset += aligned(count * np.dtype(dtype).itemsize)
+            return data
+
+        def bitmap() -> np.ndarray:
+            return np.unpackbits(
+                section(dtype="u1", shape=((n_states + 7) // 8,)), count=n_states, bitorder="little"
+            ).astype(bool)
+
+        final: np.ndarray = bitmap()
+        edges: np.ndarray = section(dtype="<i4", shape=(n_edges, 3))
+        outputs: np.ndarray = section(dtype="<i4", shape=(n_edges,)) if kind == MEALY_KIND else None
+        state_outputs: np.ndarray = section(dtype="<i4", shape=(n_states,)) if kind == MOORE_KIND else None
+
+        table: np.ndarray = None
+        output_table: np.ndarray = None
+        live: np.ndarray = None
+        padded: np.ndarray = None
+        if flags & DETERMINISTIC_FLAG:
+            table = section(dtype="<i4", shape=(n_states, n_symbols))
+            if kind == MEALY_KIND:
+                output_table = section(dtype="<i4", shape=(n_states, n_symbols))
+            if flags & LIVE_FLAG:
+                live = bitmap()
+                padded = section(dtype="<i4", shape=(n_states + 1, n_symbols + 1))
+
+        arguments: Dict[str, object] = {
+            "labels": names[:n_states],
+            "symbols": names[n_states:n_states + n_symbols],
+            "initial": initial,
+            "final": final,
+            "edges": edges,
+            "table": table,
+            "deterministic": bool(flags & DETERMINISTIC_FLAG)
+        }
+        if kind == MEALY_KIND:
+            loaded: TransitionTable = MealyTable(
+                **arguments, output_symbols=names[n_states + n_symbols:], outputs=outputs, output_table=output_table
+            )
+        elif kind == MOORE_KIND:
+            loaded = MooreTable(**arguments, output_symbols=names[n_states + n_symbols:], state_outputs=state_outputs)
+        else:
+            loaded = TransitionTable(**arguments)
+
+        loaded.live_cache = live
+        loaded.padded_cache = padded
+        if mmap:
+            loaded.source = path
+
+        return loaded
+
+    def viable(self, string: Sequence[str]) -> List[Set[int]]:
+        """For each position of a string, collect the states from which the rest of it is accepted."""
+
+        codes: List[int] = self.encode(string)
+
+        viable: List[Set[int]] = [set() for _ in range(len(codes) + 1)]
+        viable[-1] = {state for state in range(len(self.labels)) if self.final[state]}
+
+        # walk the string backwards, following transactions in reverse
+        for position in range(len(codes) - 1, -1, -1):
+            code: int = codes[position]
+            if code == DEAD:
+                continue
+            for arrival in viable[position + 1]:
+                viable[position].update(self.predecessors[arrival][code])
+
+        return viable
+
+    def completable(self, length: int) -> List[List[bool]]:
+        """completable[r][state] tells whether some string of exactly r symbols leads from state to a final state."""
+
+        completable: List[List[bool]] = [self.final.tolist()]
+        for _ in range(length):
+            after: List[bool] = completable[-1]
+            completable.append([
+                any(after[arrival] for arrivals in row for arrival in arrivals) for row in self.successors
+            ])
+
+        return completable
+
+    def words(self, max_length: int) -> Iterator[str]:
+        """Yield the accepted strings of up to max_length symbols in shortlex order, visiting only useful prefixes."""
+
+        if self.initial == DEAD:
+            return
+
+        completable: List[List[bool]] = self.completable(max_length)
+
+        for length in range(max_length + 1):
+            if not completable[length][self.initial]:
+                continue
+
+            if length == 0:
+                yield ""
+                continue
+
+            # depth-first walk in symbol order, entering only states that can still finish a word of this length
+            prefix: List[str] = []
+            stack: List[Iterator[Tuple[int, int]]] = [self.moves(self.initial, completable[length - 1])]
+
+            while stack:
+                move: Tuple[int, int] = next(stack[-1], None)
+                if move is None:
+                    stack.pop()
+                    if prefix:
+                        prefix.pop()
+                    continue
+
+                code, arrival = move
+                prefix.append(self.symbols[code])
+                remaining: int = length - len(prefix)
+
+                if remaining == 0:
+                    yield "".join(prefix)
+                    prefix.pop()
+                else:
+                    stack.append(self.moves(arrival, completable[remaining - 1]))
+
+    def moves(self, state: int, useful: List[bool]) -> Iterator[Tuple[int, int]]:
+        """Transitions (symbol, arrival) leaving a state in symbol order, restricted to useful arrivals."""
+
+        return (
+            (code, arrival)
+            for code, arrivals in enumerate(self.successors[state])
+            for arrival in arrivals
+            if useful[arrival]
+        )
+
+    def count(self, length: int) -> int:
+        """Number of paths of exactly length symbols from the initial to a final state, which counts words on a DFA."""
+
+        if self.initial == DEAD:
+            return 0
+
+        # paths[state] is the number of paths of the current length from the initial state to state
+        paths: List[int] = [0] * len(self.labels)
+        paths[self.initial] = 1
+
+        for _ in range(length):
+            following: List[int] = [0] * len(self.labels)
+            for departure, _, arrival in self.edge_list:
+                if paths[departure]:
+                    following[arrival] += paths[departure]
+            paths = following
+
+        return sum(paths[state] for state in range(len(self.labels)) if self.final[state])
+
+    def determinize(self, verbose: bool = False, limit: int = None) -> "TransitionTable":
+        """
+        Build an equivalent deterministic table by subset construction, exploring only reachable subsets, and raise
+        once more than limit subsets are found, if given.
+        """
+
+        if self.initial == DEAD:
+            return TransitionTable(labels=[], symbols=self.symbols, initial=DEAD, final=[], edges=[])
+
+        # each subset of states is hash-consed to the id of the deterministic state that represents it
+        start: FrozenSet[int] = frozenset((self.initial,))
+        subset_ids: Dict[FrozenSet[int], int] = {start: 0}
+        subsets: List[FrozenSet[int]] = [start]
+        edges: List[Tuple[int, int, int]] = []
+
+        current: int = 0
+        while current < len(subsets):
+            subset: FrozenSet[int] = subsets[current]
+
+            for code in range(len(self.symbols)):
+                arrival: FrozenSet[int] = frozenset(
+                    state for departure in subset for state in self.successors[departure][code]
+                )
+                if not arrival:
+                    continue  # the empty subset is the implicit dead state
+
+                if arrival not in subset_ids:
+                    subset_ids[arrival] = len(subsets)
+                    subsets.append(arrival)
+                    if limit is not None and len(subsets) > limit:
+                        raise ValueError(f"Determinizing {len(self.labels)} states needs more than {limit} subsets.")
+                edges.append((current, code, subset_ids[arrival]))
+
+            current += 1
+
+            if verbose and current % 1000 == 0:
+                print(f"Determinizing: {current} subsets explored, {len(subsets) - current} pending, {len(edges)} edges.")
+
+        if verbose:
+            print(f"Determinized {len(self.labels)} states into {len(subsets)} states and {len(edges)} edges.")
+
+        return TransitionTable(
+            labels=[self.subset_label(subset) for subset in subsets],
+            symbols=self.symbols,
+            initial=0,
+            final=[any(self.final[state] for state in subset) for subset in subsets],
+            edges=edges
+        )
+
+    def product(self, other: "TransitionTable", combine: Callable[[bool, bool], bool]) -> "TransitionTable":
+        """
+        Deterministic table that runs two deterministic tables at once, exploring only reachable pairs of states. A pair
+        is final when combine(left is final, right is final) holds, where a DEAD side is never final.
+        """
+
+        if not (self.deterministic and other.deterministic):
+            raise ValueError("Only deterministic tables can be combined, determinize them first.")
+        if self.symbols != other.symbols:
+            raise ValueError(f"Alphabets {self.symbols} and {other.symbols} differ.")
+
+        # pairs where one side is dead are only worth exploring if the other side alone can make them final
+        keep_left_dead: bool = combine(False, True)
+        keep_right_dead: bool = combine(True, False)
+
+        def is_final(table: TransitionTable, state: int) -> bool:
+            return state != DEAD and bool(table.final[state])
+
+        def useful(pair: Tuple[int, int]) -> bool:
+            left, right = pair
+            if left == DEAD and right == DEAD:
+                return False
+            return (left != DEAD or keep_left_dead) and (right != DEAD or keep_right_dead)
+
+        start: Tuple[int, int] = (self.initial, other.initial)
+        if not useful(start):
+            return TransitionTable(labels=[], symbols=self.symbols, initial=DEAD, final=[], edges=[])
+
+        pair_ids: Dict[Tuple[int, int], int] = {start: 0}
+        pairs: List[Tuple[int, int]] = [start]
+        edges: List[Tuple[int, int, int]] = []
+
+        for current, (left, right) in enumerate(pairs):
+            for code in range(len(self.symbols)):
+                arrival: Tuple[int, int] = (
+                    self.rows[left][code] if left != DEAD else DEAD,
+                    other.rows[right][code] if right != DEAD else DEAD
+                )
+                if not useful(arrival):
+                    continue
+
+                if arrival not in pair_ids:
+                    pair_ids[arrival] = len(pairs)
+                    pairs.append(arrival)
+                edges.append((current, code, pair_ids[arrival]))
+
+        return TransitionTable(
+            labels=[
+                f"({self.labels[left] if left != DEAD else '-'},{other.labels[right] if right != DEAD else '-'})"
+                for left, right in pairs
+            ],
+            symbols=self.symbols,
+            initial=0,
+            final=[combine(is_final(self, left), is_final(other, right)) for left, right in pairs],
+            edges=edges
+        )
+
+    def shortest_word(self) -> Optional[str]:
+        """One of the shortest accepted strings, found by breadth-first search, or None if nothing is accepted."""
+
+        if self.initial == DEAD:
+            return None
+
+        # parent[state] is the (previous state, symbol) that first reached state
+        parent: Dict[int, Tuple[int, int]] = {self.initial: None}
+        queue: List[int] = [self.initial]
+
+        for state in queue:
+            if self.final[state]:
+                symbols: List[str] = []
+                while parent[state] is not None:
+                    state, code = parent[state]
+                    symbols.append(self.symbols[code])
+                return "".join(reversed(symbols))
+
+            for code, arrivals in enumerate(self.successors[state]):
+                for arrival in arrivals:
+                    if arrival not in parent:
+                        parent[arrival] = (state, code)
+                        queue.append(arrival)
+
+        return None
+
+    def complete(self) -> "TransitionTable":
+        """Equivalent deterministic table with a transition for every state and symbol, missing ones going to a sink."""
+
+        if not self.deterministic:
+            raise ValueError("Only deterministic tables can be completed, determinize it first.")
+
+        if self.initial != DEAD and all(arrival != DEAD for row in self.rows for arrival in row):
+            return self
+
+        # the sink takes the first label not used by another state
+        sink_label: str = "sink"
+        while sink_label in self.index:
+            sink_label += "'"
+        sink: int = len(self.labels)
+
+        edges: List[Tuple[int, int, int]] = [
+            (departure, code, arrival if arrival != DEAD else sink)
+            for departure, row in enumerate(self.rows + [[DEAD] * len(self.symbols)])
+            for code, arrival in enumerate(row)
+        ]
+
+        return TransitionTable(
+            labels=self.labels + [sink_label],
+            symbols=self.symbols,
+            initial=self.initial if self.initial != DEAD else sink,
+            final=self.final.tolist() + [False],
+            edges=edges
+        )
+
+    def complement(self) -> "TransitionTable":
+        """Complete deterministic table that accepts exactly the strings this table rejects."""
+
+        complete: TransitionTable = self.complete()
+
+        return TransitionTable(
+            labels=complete.labels,
+            symbols=complete.symbols,
+            initial=complete.initial,
+            final=(~complete.final).tolist(),
+            edges=complete.edges
+        )
+
+    def trim(self) -> "TransitionTable":
+        """
+        Equivalent table keeping only the states that are reachable from the initial state, found by a forward search,
+        and that can reach a final state, found by a backward search. States keep their relative order.
+        """
+
+        if self.live_initial == DEAD:
+            return self.restrict(kept=[])
+
+        reachable: Set[int] = {self.initial}
+        stack: List[int] = [self.initial]
+        while stack:
+            for arrivals in self.successors[stack.pop()]:
+                for arrival in arrivals:
+                    if arrival not in reachable:
+                        reachable.add(arrival)
+                        stack.append(arrival)
+
+        live: List[bool] = self.live.tolist()
+
+        return self.restrict(kept=[state for state in range(len(self.labels)) if state in reachable and live[state]])
+
+    def restrict(self, kept: List[int]) -> "TransitionTable":
+        """Table with only the given states and the edges between them, without an initial state if it is left out."""
+
+        renumber: Dict[int, int] = {state: i for i, state in enumerate(kept)}
+
+        return TransitionTable(
+            labels=[self.labels[state] for state in kept],
+            symbols=self.symbols,
+            initial=renumber.get(self.initial, DEAD),
+            final=[bool(self.final[state]) for state in kept],
+            edges=[
+                (renumber[departure], code, renumber[arrival])
+                for departure, code, arrival in self.edge_list
+                if departure in renumber and arrival in renumber
+            ]
+        )
+
+    def subset_label(self, subset: FrozenSet[int]) -> str:
+        """Label of the state that represents a set of states, like {q0,q1}."""
+
+        if len(subset) == 1:
+            return self.labels[next(iter(subset))]
+        return "{" + ",".join(self.labels[state] for state in sorted(subset)) + "}"
+
+    def minimize(self) -> "TransitionTable":
+        """Build the minimal equivalent deterministic table by Hopcroft's partition refinement."""
+
+        if not self.deterministic:
+            raise ValueError("Only deterministic tables can be minimized, determinize it first.")
+
+        if self.initial == DEAD:
+            return TransitionTable(labels=[], symbols=self.symbols, initial=DEAD, final=[], edges=[])
+
+        # keep only states reachable from the initial one, in breadth-first order
+        reachable: List[int] = [self.initial]
+        seen: Set[int] = {self.initial}
+        for state in reachable:
+            for arrival in self.rows[state]:
+                if arrival != DEAD and arrival not in seen:
+                    seen.add(arrival)
+                    reachable.append(arrival)
+
+        # renumber reachable states and complete the table with an explicit dead state
+        dead: int = len(reachable)
+        renumber: Dict[int, int] = {state: i for i, state in enumerate(reachable)}
+        delta: List[List[int]] = [
+            [renumber[arrival] if arrival != DEAD else dead for arrival in self.rows[state]] for state in reachable
+        ]
+        delta.append([dead] * len(self.symbols))
+
+        inverse: List[List[List[int]]] = [[[] for _ in range(dead + 1)] for _ in self.symbols]
+        for departure, row in enumerate(delta):
+            for code, arrival in enumerate(row):
+                inverse[code][arrival].append(departure)
+
+        # initial partition separates final from non-final states
+        finals: Set[int] = {i for i, state in enumerate(reachable) if self.final[state]}
+        blocks: List[Set[int]] = [set(block) for block in (finals, set(range(dead + 1)) - finals) if block]
+        block_of: List[int] = [0] * (dead + 1)
+        for b, block in enumerate(blocks):
+            for state in block:
+                block_of[state] = b
+
+        pending: Set[int] = set(range(len(blocks)))
+        while pending:
+            splitter: Set[int] = set(blocks[pending.pop()])
+
+            for code in range(len(self.symbols)):
+                # states that move into the splitter consuming this symbol, grouped by block
+                touched: Dict[int, Set[int]] = {}
+                for arrival in splitter:
+                    for departure in inverse[code][arrival]:
+                        touched.setdefault(block_of[departure], set()).add(departure)
+
+                for b, inside in touched.items():
+                    if len(inside) == len(blocks[b]):
+                        continue
+
+                    # split the block, keeping the part outside the splitter under the same id
+                    blocks[b] -= inside
+                    blocks.append(inside)
+                    for state in inside:
+                        block_of[state] = len(blocks) - 1
+
+                    if b in pending:
+                        pending.add(len(blocks) - 1)
+                    else:
+                        pending.add(len(blocks) - 1 if len(inside) <= len(blocks[b]) else b)
+
+        # number the blocks in breadth-first order of their states, dropping the dead block
+        order: Dict[int, int] = {}
+        for state in range(dead):
+            if block_of[state] != block_of[dead] and block_of[state] not in order:
+                order[block_of[state]] = len(order)
+
+        members: List[List[int]] = [[] for _ in order]
+        for state in range(dead):
+            if block_of[state] in order:
+                members[order[block_of[state]]].append(state)
+
+        edges: List[Tuple[int, int, int]] = []
+        for b, states in enumerate(members):
+            for code, arrival in enumerate(delta[states[0]]):
+                if block_of[arrival] in order:
+                    edges.append((b, code, order[block_of[arrival]]))
+
+        return TransitionTable(
+            labels=[self.subset_label(frozenset(reachable[state] for state in states)) for states in members],
+            symbols=self.symbols,
+            initial=order[block_of[0]] if block_of[0] in order else DEAD,
+            final=[states[0] in finals for states in members],
+            edges=edges
+        )
+
+
+class PrefixCache:
+    """
+    Bounded LRU cache of the states a deterministic table reaches after prefixes of the strings it runs, so repeated
+    strings and strings with a common prefix resume from a cached state. Only prefixes whose length is a power of two
+    are remembered, so each run looks up and stores a logarithmic number of them, and only up until max_length symbols,
+    so the cache holds at most capacity * max_length symbols.
+    """
+
+    def __init__(self, table: TransitionTable, capacity: int = 4096, max_length: int = 1024):
+        if not table.deterministic:
+            raise ValueError("Only deterministic tables can be run symbol by symbol.")
+        if max_length < 1:
+            raise ValueError(f"Prefixes of at most {max_length} symbols can't be cached.")
+
+        self.table: TransitionTable = table
+        self.capacity: int = capacity
+        self.max_length: int = 1 << (max_length.bit_length() - 1)  # longest power of two prefix remembered
+        self.states: OrderedDict = OrderedDict()  # prefix -> state, from least to most recently used
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    @staticmethod
+    def key(string: Sequence[str], length: int) -> Sequence[str]:
+        """Hashable prefix of a string, either a str or a sequence of symbol labels."""
+
+        return string[:length] if isinstance(string, str) else tuple(string[:length])
+
+    def remember(self, prefix: Sequence[str], state: int):
+        """Store the state reached after a prefix, evicting the least recently used one when full."""
+
+        self.states[prefix] = state
+        self.states.move_to_end(prefix)
+        if len(self.states) > self.capacity:
+            self.states.popitem(last=False)
+
+    def accepts(self, string: Sequence[str]) -> bool:
+        """Run the table over a string, starting after its longest cached prefix."""
+
+        table: TransitionTable = self.table
+        if table.live_initial == DEAD:
+            return False
+
+        # look for the longest cached prefix, trying power of two lengths from the largest down
+        start: int = 0
+        state: int = table.initial
+        length: int = min(1 << (len(string).bit_length() - 1), self.max_length) if string else 0
+        while length:
+            prefix: Sequence[str] = self.key(string=string, length=length)
+            if prefix in self.states:
+                self.states.move_to_end(prefix)
+                start, state = length, self.states[prefix]
+                break
+            length >>= 1
+
+        if start:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        rows: List[List[int]] = table.live_rows
+        symbol_index: Dict[str, int] = table.symbol_index
+        mark: int = start * 2 if start else 1  # length of the next prefix to remember
+
+        for position in range(start, len(string)):
+            code: int = symbol_index.get(string[position], DEAD)
+            if code == DEAD:
+                return False
+            state = rows[state][code]
+            if state == DEAD:
+                return False
+
+            if position + 1 == mark and mark <= self.max_length:
+                self.remember(prefix=self.key(string=string, length=mark), state=state)
+                mark *= 2
+
+        return bool(table.final[state])
+
+
+class OutputTable(TransitionTable):
+    """
+    Transition table that generates an output symbol on each step, whose subclasses only tell, through dense_outputs,
+    which output code each transition of the dense table generates.
+    """
+
+    def __init__(
+            self, labels: List[str], symbols: List[str], initial: int, final: Sequence[bool],
+            edges: Sequence[Tuple[int, int, int]], output_symbols: List[str], table: np.ndarray = None,
+            deterministic: bool = None
+    ):
+        super().__init__(
+            labels=labels, symbols=symbols, initial=initial, final=final, edges=edges, table=table,
+            deterministic=deterministic
+        )
+        self.output_symbols: List[str] = output_symbols
+
+        self.output_rows_cache: List[List[int]] = None  # built on demand by output_rows
+
+    def dense_outputs(self) -> np.ndarray:
+        """Dense outputs[state, symbol] -> output code generated by the transition, next to table[state, symbol]."""
+
+        raise NotImplementedError
+
+    @property
+    def output_rows(self) -> List[List[int]]:
+        """Dense outputs as plain lists."""
+
+        if self.output_rows_cache is None and self.table is not None:
+            self.output_rows_cache = self.dense_outputs().tolist()
+        return self.output_rows_cache
+
+    def fill_outputs(self, string: Sequence[str]) -> array:
+        """Run a deterministic table over a string, writing the output code of each step into a preallocated buffer."""
+
+        if self.initial == DEAD:
+            raise ValueError("There is no initial state to translate from.")
+
+        rows: List[List[int]] = self.rows
+        output_rows: List[List[int]] = self.output_rows
+        symbol_index: Dict[str, int] = self.symbol_index
+
+        buffer: array = array("i", [0]) * len(string)
+        state: int = self.initial
+
+        for position, symbol in enumerate(string):
+            code: int = symbol_index.get(symbol, DEAD)
+            if code == DEAD or rows[state][code] == DEAD:
+                raise ValueError(
+                    f"No transaction from {self.labels[state]} consuming {symbol} at position {position}."
+                )
+            buffer[position] = output_rows[state][code]
+            state = rows[state][code]
+
+        return buffer
+
+    def translate(self, string: Sequence[str]) -> str:
+        """Concatenation of the outputs generated while consuming a string."""
+
+        return "".join(map(self.output_symbols.__getitem__, self.fill_outputs(string)))
+
+    def translate_bytes(self, string: Sequence[str], encoding: str = "utf-8") -> bytes:
+        """Concatenation of the encoded outputs generated while consuming a string."""
+
+        encoded: List[bytes] = [output.encode(encoding) for output in self.output_symbols]
+        return b"".join(map(encoded.__getitem__, self.fill_outputs(string)))
+
+    def translate_codes(self, string: Sequence[str]) -> np.ndarray:
+        """Output codes generated while consuming a string, one per symbol, sharing the buffer they were written to."""
+
+        return np.frombuffer(self.fill_outputs(string), dtype=np.intc)
+
+
+class MealyTable(OutputTable):
+    """Transition table whose transitions also generate an output symbol."""
+
+    def __init__(
+            self, labels: List[str], symbols: List[str], initial: int, final: Sequence[bool],
+            edges: Sequence[Tuple[int, int, int]], output_symbols: List[str], outputs: Sequence[int],
+            table: np.ndarray = None, output_table: np.ndarray = None, deterministic: bool = None
+    ):
+        super().__init__(
+            labels=labels, symbols=symbols, initial=initial, final=final, edges=edges, output_symbols=output_symbols,
+            table=table, deterministic=deterministic
+        )
+        self.outputs: Sequence[int] = outputs  # output code of each edge
+
+        # dense output_table[state, symbol] -> output, next to table[state, symbol] -> next state
+        self.output_table: np.ndarray = output_table
+        if self.output_table is None and self.deterministic:
+            edge_array: np.ndarray = self.edge_array
+            self.output_table = np.full((len(labels), len(symbols)), DEAD, dtype=np.int32)
+            self.output_table[edge_array[:, 0], edge_array[:, 1]] = np.asarray(outputs, dtype=np.int32)
+
+    def __getstate__(self) -> Dict[str, object]:
+        # the output of each edge is read back from the dense output table, in the order of the rebuilt edges
+        state: Dict[str, object] = super().__getstate__()
+        if self.deterministic:
+            state["outputs"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, object]):
+        super().__setstate__(state)
+        if self.outputs is None:
+            edge_array: np.ndarray = self.edge_array
+            self.outputs = self.output_table[edge_array[:, 0], edge_array[:, 1]]
+
+    def dense_outputs(self) -> np.ndarray:
+        return self.output_table
+
+    def restrict(self, kept: List[int]) -> "MealyTable":
+        """Table with only the given states and the edges between them, without an initial state if it is left out."""
+
+        renumber: Dict[int, int] = {state: i for i, state in enumerate(kept)}
+        edges: List[Tuple[Tuple[int, int, int], int]] = [
+            ((renumber[departure], code, renumber[arrival]), int(output))
+            for (departure, code, arrival), output in zip(self.edge_list, self.outputs)
+            if departure in renumber and arrival in renumber
+        ]
+
+        return MealyTable(
+            labels=[self.labels[state] for state in kept],
+            symbols=self.symbols,
+            initial=renumber.get(self.initial, DEAD),
+            final=[bool(self.final[state]) for state in kept],
+            edges=[edge for edge, _ in edges],
+            output_symbols=self.output_symbols,
+            outputs=[output for _, output in edges]
+        )
+
+    def finditer(self, string: Sequence[str]) -> Iterator[Tuple[int, int, str]]:
+        """
+        Yield (start, end, output) for every non-empty output, as if the initial state looped on every symbol: a run
+        leaves the initial state at each position, so an occurence overlapping a failed one is still found. end is the
+        position after the symbol that generated the output, and start the latest position from which a run reached
+        it, that is where the shortest occurence begins.
+        """
+
+        if self.initial == DEAD:
+            return
+
+        rows: List[List[int]] = self.rows
+        output_rows: List[List[int]] = self.output_rows
+        symbol_index: Dict[str, int] = self.symbol_index
+        silent: List[bool] = [output == "" for output in self.output_symbols]
+
+        # runs that reach the same state behave the same from there on, so each state keeps the latest start only
+        active: Dict[int, int] = {}  # state -> start
+
+        for position, symbol in enumerate(string):
+            active[self.initial] = position
+            code: int = symbol_index.get(symbol, DEAD)
+            if code == DEAD:
+                active = {}
+                continue
+
+            arrived: Dict[int, int] = {}
+            found: List[Tuple[int, int, str]] = []
+            for state, start in active.items():
+                arrival: int = rows[state][code]
+                if arrival == DEAD:
+                    continue
+
+                output: int = output_rows[state][code]
+                if not silent[output]:
+                    found.append((start, position + 1, self.output_symbols[output]))
+                if arrived.get(arrival, DEAD) < start:
+                    arrived[arrival] = start
+
+            yield from sorted(found)
+            active = arrived
+
+    def to_moore(self) -> "MooreTable":
+        """
+        Equivalent Moore table, whose states are the reachable pairs of a state and the output generated on entering
+        it. The initial state is paired with the first output symbol, which is never generated.
+        """
+
+        if not self.output_symbols:
+            raise ValueError("A Moore table needs at least one output symbol.")
+
+        if self.initial == DEAD:
+            return MooreTable(
+                labels=[], symbols=self.symbols, initial=DEAD, final=[], edges=[], output_symbols=self.output_symbols,
+                state_outputs=[]
+            )
+
+        # outgoing[state] holds the (symbol, arrival, output) of every edge leaving state
+        outgoing: List[List[Tuple[int, int, int]]] = [[] for _ in self.labels]
+        for (departure, code, arrival), output in zip(self.edge_list, self.outputs):
+            outgoing[departure].append((code, arrival, int(output)))
+
+        start: Tuple[int, int] = (self.initial, 0)
+        pair_ids: Dict[Tuple[int, int], int] = {start: 0}
+        pairs: List[Tuple[int, int]] = [start]
+        edges: List[Tuple[int, int, int]] = []
+
+        for current, (state, _) in enumerate(pairs):
+            for code, arrival, output in outgoing[state]:
+                if (arrival, output) not in pair_ids:
+                    pair_ids[(arrival, output)] = len(pairs)
+                    pairs.append((arrival, output))
+                edges.append((current, code, pair_ids[(arrival, output)]))
+
+        return MooreTable(
+            labels=[f"{self.labels[state]}/{self.output_symbols[output]}" for state, output in pairs],
+            symbols=self.symbols,
+            initial=0,
+            final=[bool(self.final[state]) for state, _ in pairs],
+            edges=edges,
+            output_symbols=self.output_symbols,
+            state_outputs=[output for _, output in pairs]
+        )
+
+
+class MooreTable(OutputTable):
+    """
+    Transition table whose states generate an output symbol each time they are entered, so a translation leaves out
+    the output of the initial state.
+    """
+
+    def __init__(
+            self, labels: List[str], symbols: List[str], initial: int, final: Sequence[bool],
+            edges: Sequence[Tuple[int, int, int]], output_symbols: List[str], state_outputs: Sequence[int],
+            table: np.ndarray = None, deterministic: bool = None
+    ):
+        super().__init__(
+            labels=labels, symbols=symbols, initial=initial, final=final, edges=edges, output_symbols=output_symbols,
+            table=table, deterministic=deterministic
+        )
+        self.state_outputs: np.ndarray = np.asarray(state_outputs, dtype=np.int32).reshape(len(labels))
+
+        self.output_list: List[int] = self.state_outputs.tolist()  # plain list for scalar indexing
+
+    def __getstate__(self) -> Dict[str, object]:
+        state: Dict[str, object] = super().__getstate__()
+        del state["output_list"]
+        return state
+
+    def __setstate__(self, state: Dict[str, object]):
+        super().__setstate__(state)
+        self.output_list = self.state_outputs.tolist()
+
+    def dense_outputs(self) -> np.ndarray:
+        # each transition generates the output of the state it enters
+        return np.where(self.table != DEAD, self.state_outputs[self.table], DEAD)
+
+    def restrict(self, kept: List[int]) -> "MooreTable":
+        """Table with only the given states and the edges between them, without an initial state if it is left out."""
+
+        restricted: TransitionTable = super().restrict(kept=kept)
+
+        return MooreTable(
+            labels=restricted.labels,
+            symbols=self.symbols,
+            initial=restricted.initial,
+            final=restricted.final,
+            edges=restricted.edges,
+            output_symbols=self.output_symbols,
+            state_outputs=[self.output_list[state] for state in kept]
+        )
+
+    def to_mealy(self) -> MealyTable:
+        """Equivalent Mealy table, where each transition generates the output of the state it enters."""
+
+        return MealyTable(
+            labels=self.labels,
+            symbols=self.symbols,
+            initial=self.initial,
+            final=self.final,
+            edges=self.edges,
+            output_symbols=self.output_symbols,
+            outputs=[self.output_list[arrival] for _, _, arrival in self.edge_list],
+            table=self.table
+        )
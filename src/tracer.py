@@ -0,0 +1,119 @@
+from typing import List, Tuple, Sequence, Deque, Iterator
+from collections import Counter, deque
+
+from src.state import State
+from src.transaction import Transaction
+
+
+class Tracer:
+    """Observer of a traced run, whose hooks do nothing, so subclasses only override the events they need."""
+
+    def start(self, string: Sequence[str], state: State):
+        """Called before the first symbol is consumed, with the initial state, or None if there is none."""
+
+    def step(self, position: int, transaction: Transaction, choices: int):
+        """Called when the symbol at a position is consumed by a transaction, chosen among the available ones."""
+
+    def finish(self, position: int, state: State, accepted: bool):
+        """Called when the run stops, after consuming the symbols before a position."""
+
+
+class PrintTracer(Tracer):
+    """Print each configuration of a run as (state,position), without copying what is left of the string."""
+
+    def start(self, string: Sequence[str], state: State):
+        if state is not None:
+            print(f"({state.label},0)", end=' -| ')
+
+    def step(self, position: int, transaction: Transaction, choices: int):
+        print(f"({transaction.arrival_state.label},{position + 1})", end=' -| ')
+
+    def finish(self, position: int, state: State, accepted: bool):
+        if accepted:
+            print(f"({state.label},{None})")
+
+
+class OutputPrintTracer(Tracer):
+    """Print the output generated by each transaction of a transducer run, one per line."""
+
+    def step(self, position: int, transaction: Transaction, choices: int):
+        print(transaction.output)
+
+
+class MatchTracer(Tracer):
+    """
+    Collect the initial position of every occurence of a word in a transducer run, for transducers that output # on
+    the delimiter following the word, printing each one as it is found when verbose.
+    """
+
+    def __init__(self, word: Sequence[str], verbose: bool = False):
+        self.length: int = len(word)
+        self.verbose: bool = verbose
+        self.positions: List[int] = []
+
+    def start(self, string: Sequence[str], state: State):
+        self.positions.clear()
+
+    def step(self, position: int, transaction: Transaction, choices: int):
+        if transaction.output == "#":
+            self.positions.append(position - self.length)
+            if self.verbose:
+                print(f"Position: {position}-{self.length}={position - self.length}")
+
+
+class RingTracer(Tracer):
+    """Keep the last steps of a run in a bounded buffer, as (position, departure, symbol, arrival) labels."""
+
+    def __init__(self, capacity: int = 1024):
+        self.events: Deque[Tuple[int, str, str, str]] = deque(maxlen=capacity)
+        self.accepted: bool = None  # result of the last finished run
+
+    def __len__(self):
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[Tuple[int, str, str, str]]:
+        return iter(self.events)
+
+    def start(self, string: Sequence[str], state: State):
+        self.events.clear()
+        self.accepted = None
+
+    def step(self, position: int, transaction: Transaction, choices: int):
+        self.events.append(
+            (position, transaction.departure_state.label, str(transaction.symbol), transaction.arrival_state.label)
+        )
+
+    def finish(self, position: int, state: State, accepted: bool):
+        self.accepted = accepted
+
+
+class CountingTracer(Tracer):
+    """
+    Count, over any number of runs, the steps taken, the branch points where more than one transaction was available,
+    the visits of each state and the hits of each transaction, to tell which parts of an automata are hot.
+    """
+
+    def __init__(self):
+        self.runs: int = 0
+        self.accepted: int = 0
+        self.steps: int = 0
+        self.branches: int = 0
+
+        self.visits: Counter = Counter()  # state label -> times entered, including as initial state
+        self.hits: Counter = Counter()  # transaction label -> times followed
+
+    def start(self, string: Sequence[str], state: State):
+        self.runs += 1
+        if state is not None:
+            self.visits[state.label] += 1
+
+    def step(self, position: int, transaction: Transaction, choices: int):
+        self.steps += 1
+        if choices > 1:
+            self.branches += 1
+
+        self.visits[transaction.arrival_state.label] += 1
+        self.hits[transaction.label] += 1
+
+    def finish(self, position: int, state: State, accepted: bool):
+        self.accepted += accepted
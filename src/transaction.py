@@ -1,33 +1,54 @@
 from src.state import State
-from src.automata import Symbol
+from src.symbol import Symbol
 
 
 class Transaction:
     """Possibility of movement between two automata settings."""
 
-    def __init__(self, departure_state: State, arrival_state: State, symbol: Symbol):
+    __slots__ = ("departure_state", "arrival_state", "symbol", "cached_label")
+
+    def __init__(self, departure_state: State, arrival_state: State, symbol: Symbol, label: str = None):
         self.departure_state: State = departure_state
         self.arrival_state: State = arrival_state
         self.symbol: Symbol = symbol
-        self.label: str = f"({str(self.departure_state)},{self.symbol})->{str(self.arrival_state)}"
-        self.loop: bool = True if departure_state == arrival_state else False
+        self.cached_label: str = label  # formatted on first access of label, unless already known
+
+    @property
+    def label(self) -> str:
+        if self.cached_label is None:
+            self.cached_label = self.format_label()
+        return self.cached_label
+
+    @property
+    def loop(self) -> bool:
+        return self.departure_state == self.arrival_state
+
+    def format_label(self) -> str:
+        return f"({str(self.departure_state)},{self.symbol})->{str(self.arrival_state)}"
 
     def update_label(self):
         """Used whenever a state or a transaction are updated."""
-        self.label: str = f"({str(self.departure_state)},{self.symbol})->{str(self.arrival_state)}"
+        self.cached_label = None
 
     def __str__(self):
         return self.label
 
     def __eq__(self, other):
-        if not isinstance(other, State):
+        if not isinstance(other, Transaction):
             return NotImplemented
         return self.label == other.label
 
+    def __hash__(self):
+        return hash(self.label)
+
 
 class MealyTransaction(Transaction):
 
-    def __init__(self, departure_state: State, arrival_state: State, symbol: Symbol, output: Symbol):
-        super().__init__(departure_state=departure_state, arrival_state=arrival_state, symbol=symbol)
+    __slots__ = ("output",)
+
+    def __init__(self, departure_state: State, arrival_state: State, symbol: Symbol, output: Symbol, label: str = None):
+        super().__init__(departure_state=departure_state, arrival_state=arrival_state, symbol=symbol, label=label)
         self.output: Symbol = output
-        self.label: str = f"({str(self.departure_state)},{str(self.symbol)}/{str(self.output)})->{str(self.arrival_state)}"
+
+    def format_label(self) -> str:
+        return f"({str(self.departure_state)},{str(self.symbol)}/{str(self.output)})->{str(self.arrival_state)}"
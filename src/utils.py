@@ -1,53 +1,173 @@
 import re
-from typing import List, Dict, Set
-from itertools import product
+from typing import List, Dict, Set, Iterable, Iterator
+from functools import lru_cache
+from itertools import repeat
+from concurrent.futures import Executor, ProcessPoolExecutor
 
+import numpy as np
 import plotly.graph_objs as go
 from plotly.subplots import make_subplots
 import plotly.express as px
 
 
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """Compile a regex pattern, reusing the compiled pattern on later calls."""
+
+    return re.compile(pattern=pattern)
+
+
 def match_mask(pattern: str, string: str) -> bool:
     """Checks if a regex pattern matches a string."""
 
-    pattern: re.Pattern = re.compile(pattern=rf"{pattern}")
+    return compile_pattern(pattern=pattern).match(string) is not None
 
-    if re.match(pattern=pattern, string=string):
-        return True
 
-    return False
+def apply_mask(pattern: str, strings: Iterable[str]) -> Dict[str, bool]:
+    """Checks if a regex pattern matches a list of strings, returning a dictionary."""
 
+    match = compile_pattern(pattern=pattern).match
 
-def apply_mask(pattern: str, strings: List[str]) -> Dict[str, bool]:
-    """Checks if a regex pattern matches a list of strings, returning a dictionary."""
+    return {string: match(string) is not None for string in strings}
 
-    results: Dict[str, bool] = {}
 
-    for string in strings:
-        results[string] = match_mask(pattern=pattern, string=string)
+def match_chunk(pattern: str, strings: List[str]) -> List[bool]:
+    """Checks if a regex pattern matches each string of a chunk, inside a worker process."""
 
-    return results
+    match = compile_pattern(pattern=pattern).match
 
+    return [match(string) is not None for string in strings]
 
-def generate_strings(alphabet: Set[str], size: int) -> List[str]:
-    """Generate all possible strings of an alphabet with repetitions, up until a given size."""
 
-    # list to hold all strings
-    strings: List[str] = []
+def match_masks(
+        pattern: str, strings: Iterable[str], workers: int = None, chunksize: int = 10000, executor: Executor = None
+) -> np.ndarray:
+    """
+    Checks if a regex pattern matches a list of strings, returning an array of booleans in the same order. A running
+    executor is reused instead of starting one for each call.
+    """
 
-    # for each possible length (1, 2, 3, ..., n)
-    for i in range(size):
+    strings = list(strings)
+
+    if executor is None and (not workers or workers <= 1):
+        match = compile_pattern(pattern=pattern).match
+        return np.fromiter((match(string) is not None for string in strings), dtype=bool, count=len(strings))
+
+    chunks: List[List[str]] = [strings[i:i + chunksize] for i in range(0, len(strings), chunksize)]
+
+    if executor is not None:
+        results: List[List[bool]] = list(executor.map(match_chunk, repeat(pattern), chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(match_chunk, repeat(pattern), chunks))
+
+    return np.fromiter((result for chunk in results for result in chunk), dtype=bool, count=len(strings))
 
-        # for each subset of the cartesian product with repetitions
-        for p in product(alphabet, repeat=i+1):
 
-            # join all elements of the subset with an empty string
-            current_string: str = ''.join(p)
+def ordered_symbols(alphabet: Iterable[str]) -> List[str]:
+    """Symbols of an alphabet in a fixed order, sorting sets since their iteration order is arbitrary."""
 
-            # add current string to the list of all strings
-            strings.append(current_string)
+    if isinstance(alphabet, (set, frozenset)):
+        return sorted(alphabet)
+    return [str(symbol) for symbol in alphabet]
+
+
+def iterate_strings(alphabet: Iterable[str], size: int, start: int = 0, stop: int = None) -> Iterator[str]:
+    """
+    Yield all possible strings of an alphabet with repetitions, up until a given size, in shortlex order. Only the
+    strings ranked from start (inclusive) to stop (exclusive) are generated, so the enumeration can be split in shards.
+    """
+
+    symbols: List[str] = ordered_symbols(alphabet)
+    base: int = len(symbols)
+
+    if base == 0:
+        return
+
+    # rank of the first string of the current length
+    position: int = 0
+
+    # for each possible length (1, 2, 3, ..., n)
+    for length in range(1, size + 1):
+        count: int = base ** length
+
+        if position + count <= start:
+            position += count
+            continue
+
+        # digits of the first string to generate, in base len(symbols)
+        rank: int = max(start - position, 0)
+        digits: List[int] = [(rank // base ** (length - 1 - i)) % base for i in range(length)]
+        current: List[str] = [symbols[digit] for digit in digits]
+
+        for rank in range(rank, count):
+            if stop is not None and position + rank >= stop:
+                return
+
+            yield "".join(current)
+
+            # move to the next string like an odometer, from the last symbol
+            i: int = length - 1
+            while i >= 0:
+                digits[i] += 1
+                if digits[i] < base:
+                    current[i] = symbols[digits[i]]
+                    break
+                digits[i] = 0
+                current[i] = symbols[0]
+                i -= 1
+
+        position += count
+
+
+def iterate_string_blocks(
+        alphabet: Iterable[str], size: int, block_size: int = 65536, start: int = 0, stop: int = None,
+        symbols: Iterable[str] = None
+) -> Iterator[np.ndarray]:
+    """
+    Yield the same strings as iterate_strings, as blocks of strings of equal length with one string per row. Each
+    symbol is encoded by its index in symbols, such as the alphabet of the automata that recognizes the blocks, or by
+    its index in ordered_symbols(alphabet) when symbols are not given.
+    """
+
+    ordered: List[str] = ordered_symbols(alphabet)
+    base: int = len(ordered)
+
+    if base == 0:
+        return
+
+    # digit -> code of the symbol in the order expected by the consumer
+    encoding: np.ndarray = None
+    if symbols is not None:
+        symbol_index: Dict[str, int] = {str(symbol): code for code, symbol in enumerate(symbols)}
+        missing: List[str] = [symbol for symbol in ordered if symbol not in symbol_index]
+        if missing:
+            raise ValueError(f"Symbols {missing} of alphabet are not among the symbols to encode with.")
+        encoding = np.array([symbol_index[symbol] for symbol in ordered], dtype=np.int32)
+
+    position: int = 0
+
+    for length in range(1, size + 1):
+        count: int = base ** length
+        first: int = max(start - position, 0)
+        last: int = count if stop is None else min(stop - position, count)
+
+        # the digits of each rank are its symbols
+        weights: np.ndarray = base ** np.arange(length - 1, -1, -1, dtype=np.int64)
+        for block_start in range(first, last, block_size):
+            ranks: np.ndarray = np.arange(block_start, min(block_start + block_size, last), dtype=np.int64)
+            digits: np.ndarray = ((ranks[:, None] // weights) % base).astype(np.int32)
+            yield digits if encoding is None else encoding[digits]
+
+        position += count
+        if stop is not None and position >= stop:
+            return
+
+
+def generate_strings(alphabet: Set[str], size: int) -> List[str]:
+    """Generate all possible strings of an alphabet with repetitions, up until a given size, in shortlex order."""
 
-    return strings
+    return list(iterate_strings(alphabet=alphabet, size=size))
 
 
 def string_heatmap(strings, title='', figsize=(800, 800), fontsize=14, filename=None):